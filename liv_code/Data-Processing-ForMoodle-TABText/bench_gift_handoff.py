@@ -0,0 +1,119 @@
+"""
+Benchmark CSV -> GIFT conversion on the Data_EngGrmr files.
+
+Compares, over every english_N.csv:
+- round trip: the old flow, lists in memory, english_N_out.csv written
+  with write_tab_csv and read back with read_tab_csv for process_4gift
+- in memory + debug: convert() writing english_N_out.csv on the side
+- in memory: convert() with rows handed straight to the GIFT stage
+
+The GIFT files are checked to be identical first. All files go through
+one processor module (they share the same layout).
+
+Usage:
+    python bench_gift_handoff.py [repeats] [processor number]
+"""
+
+import contextlib
+import filecmp
+import io
+import re
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from config import BASE_DIR
+from file_io import (
+    read_tab_csv,
+    remove_imagelinks,
+    trim_empty_columns,
+    write_gift_file,
+    write_tab_csv,
+)
+import main
+
+DATA_DIR = BASE_DIR / "Data_EngGrmr"
+if not DATA_DIR.exists():
+    DATA_DIR = Path(__file__).parent / "Data_EngGrmr"
+
+
+def input_files():
+    return sorted(
+        (p for p in DATA_DIR.glob("english_*.csv") if re.fullmatch(r"english_\d+\.csv", p.name)),
+        key=lambda p: int(p.stem.split("_")[1]),
+    )
+
+
+def round_trip(processor, input_path, out_path, gift_path):
+    data = trim_empty_columns(remove_imagelinks(read_tab_csv(input_path)))
+    data = processor["cloze"](processor["mcq"](data))
+    write_tab_csv(out_path, data)
+    write_gift_file(gift_path, processor["gift"](read_tab_csv(out_path)))
+
+
+def in_memory_debug(processor, input_path, out_path, gift_path):
+    main.convert(processor["number"], input_path, gift_path, out_path)
+
+
+def in_memory(processor, input_path, out_path, gift_path):
+    main.convert(processor["number"], input_path, gift_path)
+
+
+def timed(label, fn, processor, files, work, repeats):
+    """Best of `repeats` runs over all files (small files: noise is mostly disk)."""
+    best = float("inf")
+    with contextlib.redirect_stdout(io.StringIO()):     # "Processor N loaded"
+        for _ in range(repeats):
+            start = time.perf_counter()
+            for path in files:
+                fn(processor, path, work / f"{path.stem}_out.csv", work / f"{path.stem}_{fn.__name__}.gift")
+            best = min(best, time.perf_counter() - start)
+    print(f"{label:<34}{best * 1000:>10.1f} ms")
+    return best
+
+
+def main_bench():
+    repeats = int(sys.argv[1]) if len(sys.argv) > 1 else 5
+    number = int(sys.argv[2]) if len(sys.argv) > 2 else 2
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        processor = {
+            "number": number,
+            "mcq": main.load_processor(number, 2),
+            "cloze": main.load_processor(number, 0),
+            "gift": main.load_processor(number, 1),
+        }
+
+    files = input_files()
+    if not files:
+        raise SystemExit(f"No english_N.csv files in {DATA_DIR}")
+    rows = sum(1 for path in files for _ in open(path, encoding="utf-8"))
+
+    with tempfile.TemporaryDirectory() as tmp:
+        work = Path(tmp)
+        modes = [round_trip, in_memory_debug, in_memory]
+
+        # ---- Same GIFT output from every mode ----
+        with contextlib.redirect_stdout(io.StringIO()):
+            for fn in modes:
+                for path in files:
+                    fn(processor, path, work / f"{path.stem}_out.csv", work / f"{path.stem}_{fn.__name__}.gift")
+        for path in files:
+            for fn in modes[1:]:
+                assert filecmp.cmp(
+                    work / f"{path.stem}_round_trip.gift",
+                    work / f"{path.stem}_{fn.__name__}.gift",
+                    shallow=False,
+                ), (path.name, fn.__name__)
+
+        print(f"\n{len(files)} files, {rows} rows, GIFT output identical\n")
+        print(f"wall time for all files (best of {repeats})")
+        base = timed("  write + re-read _out.csv", round_trip, processor, files, work, repeats)
+        debug = timed("  in memory + debug _out.csv", in_memory_debug, processor, files, work, repeats)
+        new = timed("  in memory", in_memory, processor, files, work, repeats)
+        print(f"  speedup: {base / debug:.1f}x with debug file, {base / new:.1f}x without")
+
+
+if __name__ == "__main__":
+    main_bench()
@@ -13,3 +13,7 @@ OUTPUT_SUFFIX = "_out"
 #gift format suffix
 OUTPUT_SUFFIX_GIFT = "_gift.gift"
 INPUT_PATTERN_GIFT = "english_{num}_out.csv"
+
+# Rows go straight from the CSV to the GIFT file in memory.
+# Set True to also write english_N_out.csv (marker rows) for debugging.
+WRITE_OUT_CSV = False
@@ -1,4 +1,5 @@
 import csv
+from contextlib import contextmanager
 from config import BASE_DIR, INPUT_PATTERN, INPUT_PATTERN_GIFT, OUTPUT_SUFFIX, OUTPUT_SUFFIX_GIFT
 import re
 
@@ -20,6 +21,21 @@ def get_input_output_paths(file_number: int):
     return input_path, output_path, input_path_gift, output_path_gift
 
 
+def find_input_files():
+    """[(file_number, input_path)] for every INPUT_PATTERN file, by number."""
+
+    prefix, _, suffix = INPUT_PATTERN.partition("{num}")
+    name_pattern = re.compile(re.escape(prefix) + r"(\d+)" + re.escape(suffix))
+
+    files = []
+    for path in (BASE_DIR / "Data_EngGrmr").glob(INPUT_PATTERN.format(num="*")):
+        match = name_pattern.fullmatch(path.name)
+        if match:
+            files.append((int(match.group(1)), path))
+
+    return sorted(files)
+
+
 def read_tab_csv(path):
     """Read TAB-delimited CSV."""
     
@@ -27,6 +43,13 @@ def read_tab_csv(path):
         reader = csv.reader(f, delimiter="\t")
         return list(reader)
 
+
+def iter_tab_csv(path):
+    """Yield rows of a TAB-delimited CSV one at a time."""
+
+    with open(path, "r", newline="", encoding="utf-8") as f:
+        yield from csv.reader(f, delimiter="\t")
+
 def read_tab_csv_backup(path):
     """Read TAB CSV with optional delimiter merge."""
 
@@ -81,13 +104,21 @@ def update_column_header(data, fromC, max_columns, header_prefix):
 
 
 def write_tab_csv(path, data):
-    """Write TAB-delimited CSV."""
+    """Write TAB-delimited CSV (data may be a lazy row iterator)."""
     
     with open(path, "w", newline="", encoding="utf-8") as f:
         writer = csv.writer(f, delimiter="\t")
         writer.writerows(data)
 
 
+@contextmanager
+def open_tab_writer(path):
+    """csv.writer for a TAB-delimited file, to write rows as they come."""
+
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        yield csv.writer(f, delimiter="\t")
+
+
 def write_tab_csv_backup(path,data):
     """Write TAB CSV with normalized delimiters."""
     merge_empty=True
@@ -103,12 +134,32 @@ def write_tab_csv_backup(path,data):
 
 
 def write_gift_file(path, data):
-    """Write GIFT-formatted file."""
+    """Write GIFT-formatted file (data may be a lazy iterator), returns the count."""
     
+    count = 0
     with open(path, "w", encoding="utf-8") as f:
         for q in data:
             f.write(q + "\n")
+            count += 1
+    return count
      
+def trim_empty_row(row):
+    """
+    One row of trim_empty_columns: keep cells up to the first empty one.
+    """
+
+    new_row = []
+
+    for cell in row:
+        # Treat None, empty string, or whitespace as empty
+        if cell is None or str(cell).strip() == "":
+            break
+
+        new_row.append(cell)
+
+    return new_row
+
+
 def trim_empty_columns(data):
     """
     For each row in TAB-delimited data:
@@ -117,40 +168,31 @@ def trim_empty_columns(data):
     - Return processed data
     """
 
-    processed_data = []
-
-    for row in data:
-        new_row = []
+    return [trim_empty_row(row) for row in data]
 
-        for cell in row:
-            # Treat None, empty string, or whitespace as empty
-            if cell is None or str(cell).strip() == "":
-                break
 
-            new_row.append(cell)
+# Regex to match <img src ... />
+IMG_PATTERN = re.compile(r'<img\s+src.*?/>', re.IGNORECASE)
 
-        processed_data.append(new_row)
-
-    return processed_data
 
+def remove_imagelinks_row(row):
+    """
+    One row of remove_imagelinks, cleaned in place.
+    """
 
+    for c, cell in enumerate(row):
 
-def remove_imagelinks(data):
+        if isinstance(cell, str):
+            # Remove the img tag, strip extra whitespace left behind
+            row[c] = IMG_PATTERN.sub('', cell).strip()
 
-    # Regex to match <img src ... />
-    img_pattern = re.compile(r'<img\s+src.*?/>', re.IGNORECASE)
+    return row
 
-    for r, row in enumerate(data):
-        for c, cell in enumerate(row):
 
-            if isinstance(cell, str):
-                # Remove the img tag
-                cleaned = re.sub(img_pattern, '', cell)
-
-                # Optional: strip extra whitespace left behind
-                cleaned = cleaned.strip()
+def remove_imagelinks(data):
 
-                data[r][c] = cleaned
+    for row in data:
+        remove_imagelinks_row(row)
 
     return data
 
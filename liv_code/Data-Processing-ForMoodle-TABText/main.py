@@ -1,47 +1,125 @@
-import importlib
+import argparse
+import os
 import sys
-import analyzer
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import registry
+from config import WRITE_OUT_CSV
 from file_io import (
+    find_input_files,
     get_input_output_paths,
-    read_tab_csv,
-    remove_imagelinks,
-    trim_empty_columns,
+    iter_tab_csv,
+    open_tab_writer,
+    remove_imagelinks_row,
+    trim_empty_row,
     write_gift_file,
-    write_tab_csv,
-    insert_column_header,
 )
+from pipeline import build_pipeline, indexed_stage, row_stage, tap_stage
 
-#returns the function  reference of dynamic module.
-def load_processor(file_number: int, format: int):
-    """
-    Dynamically load processor module.
-    Example: processors.english_1
-    """
-    
-    module_name = f"processors.english_{file_number}"
+#list-at-a-time processors, by format.
+PROCESSORS = {
+    0: "process_cloze",
+    1: "process_4gift",
+    2: "process_mcq",
+}
 
-    try:
-        module = importlib.import_module(module_name)
-        if format == 0:
-           print("Processor 1 loaded")
-           return module.process_cloze
+#row-at-a-time functions convert() chains, by role.
+ROW_PROCESSORS = {
+    "question": "parse_question",    # tokenizer: row -> Question
+    "gift": "question_to_gift",      # Question -> GIFT entry
+}
 
-        elif format == 1:
-             print("Processor 2 loaded")
-             return module.process_4gift
 
-        elif format == 2:
-             print("Processor 3 loaded")
-             return module.process_mcq
+def find_processor(file_number: int, pipeline=None):
+    """Registry Processor for english_N, or the named pipeline instead."""
+
+    if pipeline is not None:
+        return registry.resolve_pipeline(pipeline)
+    return registry.resolve(file_number)
 
-        else:
-              print("Default processor loaded")
-        return module.process
 
-    except ModuleNotFoundError:
+#returns the function reference from the processor registry.
+def load_processor(file_number: int, format: int, pipeline=None):
+    """
+    Processor function for english_N (see registry.py).
+    format: 0 cloze, 1 gift, 2 MCQ, anything else the default `process`.
+    """
+
+    processor = find_processor(file_number, pipeline)
+    function_name = PROCESSORS.get(format, "process")
+
+    if processor is None or not processor.has(function_name):
         print(f"❌ No processor found for file {file_number}")
         sys.exit(1)
 
+    print(f"Processor {format + 1} loaded" if format in PROCESSORS else "Default processor loaded")
+    return processor.get(function_name)
+
+
+class ProcessorNotFound(LookupError):
+    """No registry pipeline with the requested function for this file."""
+
+
+def can_convert(processor):
+    """The processor has every function convert() needs."""
+    return processor.has(*ROW_PROCESSORS.values())
+
+
+def row_function(file_number: int, role: str, pipeline=None):
+    """
+    Row function for english_N from the registry (roles: ROW_PROCESSORS).
+    Raises ProcessorNotFound instead of exiting, for convert() and batch mode.
+    """
+
+    processor = find_processor(file_number, pipeline)
+    function_name = ROW_PROCESSORS[role]
+
+    if processor is None or not processor.has(function_name):
+        raise ProcessorNotFound(f"No processor found for file {file_number}")
+
+    return processor.get(function_name)
+
+
+def build_gift_pipeline(to_question, to_gift_entry, out_writer=None):
+    """
+    read -> clean -> questions -> GIFT, all in memory.
+    With out_writer, each Question's marker row is also written (debug _out.csv).
+    """
+
+    stages = [
+        row_stage(remove_imagelinks_row),
+        row_stage(trim_empty_row),
+        indexed_stage(to_question),                             # row -> Question
+    ]
+
+    if out_writer is not None:
+        stages.append(tap_stage(lambda question: out_writer.writerow(question.to_row())))
+
+    stages.append(row_stage(to_gift_entry, skip_none=True))     # GIFT
+    return build_pipeline(*stages)
+
+
+def convert(file_number: int, input_path, output_path_gift, output_path=None, pipeline=None):
+    """
+    english_N.csv -> GIFT file in one pass, returns the number of questions.
+    output_path (optional) is the debug _out.csv; pipeline overrides the
+    registry's choice for this file. Raises ProcessorNotFound before any
+    output file is opened.
+    """
+
+    to_question = row_function(file_number, "question", pipeline)
+    to_gift_entry = row_function(file_number, "gift", pipeline)
+
+    if output_path is None:
+        to_gift = build_gift_pipeline(to_question, to_gift_entry)
+        return write_gift_file(output_path_gift, to_gift(iter_tab_csv(input_path)))
+
+    with open_tab_writer(output_path) as out_writer:
+        to_gift = build_gift_pipeline(to_question, to_gift_entry, out_writer)
+        return write_gift_file(output_path_gift, to_gift(iter_tab_csv(input_path)))
+
+
 def main():
     # ---- Ask user input ----
     try:
@@ -61,52 +139,191 @@ def main():
         print(f"❌ Input file not found: {input_path}")
         return
 
-    # ----1st Read data ----
-    data = read_tab_csv(input_path)
-    data = remove_imagelinks(data)
-    data = trim_empty_columns(data)
-
-    
-    #Check MCQs
-    # ---- Load processor ----MCQs
-    processor = load_processor(file_number,2)
-
-    # ---- Process data ----
-    processed_data = processor(data)
-    
-    # ---- Load processor ---- Fill-in the-blank
-    processor = load_processor(file_number,0)
-    
-    # ---- Process data ----
-    processed_data = processor(processed_data)
-    
-    # ---- Write output ----
-    write_tab_csv(output_path, processed_data)
-
+    # ---- Run: rows flow from the CSV straight into the GIFT file ----
+    try:
+        convert(
+            file_number,
+            input_path,
+            output_path_gift,
+            output_path if WRITE_OUT_CSV else None,
+        )
+    except ProcessorNotFound as e:
+        print(f"❌ {e}")
+        return
 
     # ---- Exit message ----
-    print(f"✅ Output written to: {output_path}")
+    if WRITE_OUT_CSV:
+        print(f"✅ Output written to: {output_path}")
+    print(f"✅ Output written to: {output_path_gift}")
 
-    if not input_path_gift.exists():
-        print(f"❌ Input file not found: {input_path_gift}")
-        return
 
-    # ---- Read data ----
-    data = read_tab_csv(input_path_gift)
+# ---------- BATCH MODE ----------
+def convert_job(file_number: int, pipeline: str, write_out_csv: bool):
+    """
+    One file in a worker process: (file_number, questions or None, seconds, error).
+    """
+
+    input_path, output_path, _, output_path_gift = get_input_output_paths(file_number)
+    start = time.perf_counter()
 
-     # ---- Load processor for gift----
-    processor = load_processor(file_number,1)
+    try:
+        count = convert(
+            file_number,
+            input_path,
+            output_path_gift,
+            output_path if write_out_csv else None,
+            pipeline,
+        )
+    except ProcessorNotFound as e:
+        return file_number, None, 0.0, str(e)
+    except Exception as e:
+        return file_number, None, time.perf_counter() - start, f"{type(e).__name__}: {e}"
 
-    # ---- Process data for gift ----
-    processed_data = processor(data)
-    
-    # ---- Write output for gift ----
-    write_gift_file(output_path_gift, processed_data)
+    return file_number, count, time.perf_counter() - start, None
 
-    
-    # ---- Exit message ----
-    print(f"✅ Output written to: {output_path_gift}")
+
+def batch_pipeline(file_number: int, default_pipeline=None):
+    """
+    (pipeline name, None) to convert english_N with, or (None, reason) to skip it.
+    default_pipeline only applies to files that are not in the registry;
+    a registered file is never run through another pipeline.
+    """
+
+    processor = registry.resolve(file_number)
+
+    if processor is None:
+        if default_pipeline is None:
+            return None, "not in the registry (use --default-pipeline)"
+        processor = registry.resolve_pipeline(default_pipeline)
+
+    if not can_convert(processor):
+        return None, f"pipeline {processor.name} can't produce GIFT"
+    return processor.name, None
+
+
+def run_batch(files, workers=None, default_pipeline=None, write_out_csv=WRITE_OUT_CSV):
+    """
+    Convert every (file_number, path) across a process pool.
+    Files not in the registry use default_pipeline, or are skipped, as are
+    files whose pipeline can't produce GIFT. Prints a line per file and a summary.
+    """
+
+    jobs = []
+    skipped = {}    # reason -> file numbers
+    for file_number, path in files:
+        pipeline, reason = batch_pipeline(file_number, default_pipeline)
+        if pipeline is None:
+            skipped.setdefault(reason, []).append(file_number)
+        else:
+            registry.resolve_pipeline(pipeline)   # imported once, before the workers fork
+            jobs.append((file_number, pipeline))
+
+    workers = workers or os.cpu_count() or 1
+    print(f"{len(files)} input file(s), {len(jobs)} to convert with {workers} worker(s)\n")
+
+    results = []
+    start = time.perf_counter()
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = {
+            pool.submit(convert_job, file_number, pipeline, write_out_csv): pipeline
+            for file_number, pipeline in jobs
+        }
+
+        for future in as_completed(futures):
+            file_number, count, seconds, error = future.result()
+            results.append((file_number, count, seconds, error))
+            name = get_input_output_paths(file_number)[0].name
+
+            if error:
+                print(f"❌ {name:<22} {error}")
+            else:
+                print(f"✅ {name:<22} {futures[future]:<14}{count:>7} questions {seconds * 1000:>9.1f} ms")
+
+    wall = time.perf_counter() - start
+    done = [r for r in results if r[3] is None]
+    busy = sum(r[2] for r in done)
+
+    # ---- Summary ----
+    print(f"\nConverted {len(done)} file(s), {sum(r[1] for r in done)} questions")
+    for reason, numbers in skipped.items():
+        print(f"Skipped {len(numbers)} file(s), {reason}: "
+              + ", ".join(map(str, numbers[:20])) + (" ..." if len(numbers) > 20 else ""))
+    if len(done) < len(results):
+        print(f"Failed {len(results) - len(done)} file(s)")
+    print(f"Wall {wall:.2f} s, per-file times add up to {busy:.2f} s")
+
+    return results
+
+
+def list_processors():
+    """Print the processor registry: pipelines, parameters, files, stages."""
+
+    for name, spec, file_numbers in registry.describe():
+        params = ", ".join(f"{k}={v!r}" for k, v in spec.params.items()) or "-"
+        files = ", ".join(map(str, file_numbers)) or "-"
+        print(f"{name}: {spec.description}")
+        print(f"    module  {spec.module}")
+        print(f"    params  {params}")
+        print(f"    files   {files}")
+
+        processor = registry.resolve_pipeline(name)
+        if can_convert(processor):
+            stages = build_gift_pipeline(
+                processor.get(ROW_PROCESSORS["question"]),
+                processor.get(ROW_PROCESSORS["gift"]),
+            ).stages
+            print(f"    stages  {' -> '.join(stages)}")
+        else:
+            print(f"    stages  list functions only: {', '.join(processor.functions)}")
+
+
+def gift_pipelines():
+    """Names of the pipelines that have the row functions batch mode needs."""
+    return sorted(
+        name for name in registry.PIPELINES
+        if can_convert(registry.resolve_pipeline(name))
+    )
+
+
+def batch_main(argv):
+    parser = argparse.ArgumentParser(
+        description="Convert english_N.csv files to GIFT. Without options: asks for one file number."
+    )
+    parser.add_argument("--all", action="store_true", help="every file matching INPUT_PATTERN")
+    parser.add_argument("--files", type=lambda v: [int(n) for n in v.split(",") if n.strip()],
+                        help="comma-separated file numbers, e.g. 2,4,17")
+    parser.add_argument("--workers", type=int, help="processes (default: CPU count)")
+    parser.add_argument("--default-pipeline", choices=gift_pipelines(),
+                        help="pipeline for files that are not in the registry "
+                             "(registered files always use their own)")
+    parser.add_argument("--out-csv", action="store_true", help="also write the debug _out.csv files")
+    parser.add_argument("--list-processors", action="store_true", help="show the processor registry")
+    args = parser.parse_args(argv)
+
+    if args.list_processors:
+        list_processors()
+        return
+
+    files = find_input_files()
+    if args.files:
+        wanted = set(args.files)
+        files = [(n, path) for n, path in files if n in wanted]
+        missing = wanted - {n for n, _ in files}
+        if missing:
+            print(f"❌ Input file not found for: {', '.join(map(str, sorted(missing)))}")
+    elif not args.all:
+        parser.error("give --all, --files or --list-processors")
+
+    if not files:
+        print("❌ No input files found")
+        return
+
+    run_batch(files, args.workers, args.default_pipeline, args.out_csv or WRITE_OUT_CSV)
 
 
 if __name__ == "__main__":
-    main()
+    if len(sys.argv) > 1:
+        batch_main(sys.argv[1:])
+    else:
+        main()
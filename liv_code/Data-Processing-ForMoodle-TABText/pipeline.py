@@ -0,0 +1,70 @@
+"""
+Lazy row pipelines.
+
+A stage takes an iterator of rows and yields rows. Stages are chained
+with build_pipeline() and nothing runs until the sink (write_tab_csv,
+write_gift_file) pulls rows through, so only one row is in flight at a
+time whatever the file size.
+
+    clean = build_pipeline(
+        row_stage(remove_imagelinks_row),
+        row_stage(trim_empty_row),
+    )
+    write_tab_csv(out_path, clean(iter_tab_csv(in_path)))
+"""
+
+
+def row_stage(fn, skip_none=False):
+    """
+    Turn a row -> row function into a stage.
+    With skip_none, None results are dropped (rows that produce nothing).
+    """
+
+    def stage(rows):
+        for row in rows:
+            value = fn(row)
+            if value is not None or not skip_none:
+                yield value
+
+    stage.__name__ = getattr(fn, "__name__", "stage")
+    return stage
+
+
+def indexed_stage(fn):
+    """
+    Turn a (row_index, row) -> value function into a stage.
+    None results are dropped (rows that produce no question).
+    """
+
+    def stage(rows):
+        for row_index, row in enumerate(rows):
+            value = fn(row_index, row)
+            if value is not None:
+                yield value
+
+    stage.__name__ = getattr(fn, "__name__", "stage")
+    return stage
+
+
+def tap_stage(fn):
+    """Call fn(item) for its side effect (debug output) and pass item on."""
+
+    def stage(items):
+        for item in items:
+            fn(item)
+            yield item
+
+    stage.__name__ = getattr(fn, "__name__", "tap")
+    return stage
+
+
+def build_pipeline(*stages):
+    """Compose stages left to right into one rows -> rows function."""
+
+    def pipeline(rows):
+        for stage in stages:
+            rows = stage(rows)
+        return rows
+
+    pipeline.stages = [stage.__name__ for stage in stages]
+    return pipeline
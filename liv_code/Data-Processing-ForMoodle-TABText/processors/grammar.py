@@ -1,16 +1,12 @@
-# english_2.py
+# grammar.py
+#
+# Shared processor for the English grammar question files (MCQ options
+# separated by " / " plus {{c1::...}} clozes). Files are mapped to it in
+# registry.py; it used to be copied as english_2.py, english_4.py, ...
 
-import sys
-import os
 import re
 
-# Get parent directory of this script
-parent_dir = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
-
-# Add to sys.path
-sys.path.insert(0, parent_dir)
-
-# Now import file_io
+from questions import parse_question, question_to_gift
 
 
 
@@ -58,29 +54,28 @@ def process_mcq_backup(data):
     return data
 
 
-def process_mcq(data):
+def mcq_row(row):
 
-    processed_data = []
+    new_row = []
 
-    for row in data:
+    for cell in row:
 
-        new_row = []
+        if " / " in cell:
+            # Split and clean
+            parts = [part.strip() for part in cell.split(" / ") if part.strip()]
 
-        for cell in row:
+            # Append $MCQ$ and extend row
+            for part in parts:
+                new_row.append(part + "$MCQ$")
+        else:
+            new_row.append(cell)
 
-            if " / " in cell:
-                # Split and clean
-                parts = [part.strip() for part in cell.split(" / ") if part.strip()]
+    return new_row
 
-                # Append $MCQ$ and extend row
-                for part in parts:
-                    new_row.append(part + "$MCQ$")
-            else:
-                new_row.append(cell)
 
-        processed_data.append(new_row)
+def process_mcq(data):
 
-    return processed_data
+    return [mcq_row(row) for row in data]
 
 
 #Handle single cloze replacement
@@ -141,44 +136,51 @@ def process_cloze_backup(data):
 
     return data
 
-def process_cloze(data):
+def cloze_row(row):
     START_TOKEN = "{{c1::"
     END_TOKEN = "}}"
     BLANK_TOKEN = "$Blankspace$"
     FIB_PREFIX = "$FIB$"
 
-    for row in data:
-        fib_list = []
+    fib_list = []
 
-        for col_idx, cell in enumerate(row):
-            if not isinstance(cell, str):
-                continue
+    for col_idx, cell in enumerate(row):
+        if not isinstance(cell, str):
+            continue
+
+        while START_TOKEN in cell:
+            start = cell.find(START_TOKEN)
+            end = cell.find(END_TOKEN, start)
+
+            # Safety check: malformed cloze
+            if end == -1:
+                break
 
-            while START_TOKEN in cell:
-                start = cell.find(START_TOKEN)
-                end = cell.find(END_TOKEN, start)
+            # Extract answer text
+            answer = cell[start + len(START_TOKEN):end]
+            fib_list.append(FIB_PREFIX + answer)
 
-                # Safety check: malformed cloze
-                if end == -1:
-                    break
+            # Replace cloze with blankspace
+            cell = (
+                cell[:start]
+                + BLANK_TOKEN
+                + cell[end + len(END_TOKEN):]
+            )
+
+        # Update the modified cell back into row
+        row[col_idx] = cell
 
-                # Extract answer text
-                answer = cell[start + len(START_TOKEN):end]
-                fib_list.append(FIB_PREFIX + answer)
+    # ✅ KEY CHANGE HERE
+    if fib_list:
+        row.extend(fib_list)   # instead of append()
 
-                # Replace cloze with blankspace
-                cell = (
-                    cell[:start]
-                    + BLANK_TOKEN
-                    + cell[end + len(END_TOKEN):]
-                )
+    return row
 
-            # Update the modified cell back into row
-            row[col_idx] = cell
 
-        # ✅ KEY CHANGE HERE
-        if fib_list:
-            row.extend(fib_list)   # instead of append()
+def process_cloze(data):
+
+    for row in data:
+        cloze_row(row)
 
     return data
 
@@ -377,109 +379,108 @@ def process_4gift_notgood(data):
 
     return gift_questions
 
-def process_4gift(data):
-    gift_output = []
+def gift_row(row_index, row):
+    """
+    One GIFT question from an _out row, or None if the row has none.
+    """
 
-    for row_index, row in enumerate(data):
+    if not row or len(row) < 2:
+        return None  # skip invalid rows
 
-        if not row or len(row) < 2:
-            continue  # skip invalid rows
+    # -----------------------------
+    # STEP 1 — Build QuestionMoodle
+    # -----------------------------
+    question_parts = []
+    blank_col_index = None
 
-        # -----------------------------
-        # STEP 1 — Build QuestionMoodle
-        # -----------------------------
-        question_parts = []
-        blank_col_index = None
+    for col_index in range(1, len(row)):  # ignore first column
+        cell = str(row[col_index]).strip()
 
-        for col_index in range(1, len(row)):  # ignore first column
-            cell = str(row[col_index]).strip()
+        if "$" not in cell:
+            question_parts.append(cell)
+        else:
+            question_parts.append(cell)
+            blank_col_index = col_index
+            break
 
-            if "$" not in cell:
-                question_parts.append(cell)
-            else:
-                question_parts.append(cell)
-                blank_col_index = col_index
-                break
+    if blank_col_index is None:
+        return None  # no blankspace found
 
-        if blank_col_index is None:
-            continue  # no blankspace found
+    QuestionMoodle = "\n".join(question_parts)
 
-        QuestionMoodle = "\n".join(question_parts)
+    #print(QuestionMoodle)
+    # -----------------------------
+    # STEP 2 — Collect MCQ
+    # -----------------------------
+    MCQ = []
+    last_mcq_col = None
 
-        print(QuestionMoodle)
-        # -----------------------------
-        # STEP 2 — Collect MCQ
-        # -----------------------------
-        MCQ = []
-        last_mcq_col = None
+    for col_index in range(blank_col_index + 1, len(row)):
+        cell = str(row[col_index]).strip()
 
-        for col_index in range(blank_col_index + 1, len(row)):
-            cell = str(row[col_index]).strip()
+        if not cell:
+            break
 
-            if not cell:
-                break
+        if "$FIB$" in cell:
+            break
 
-            if "$FIB$" in cell:
-                break
+        if "$MCQ$" in cell:
+            cell= cell.replace("$MCQ$", "").strip()
+            MCQ.append(cell)
+            last_mcq_col = col_index
 
-            if "$MCQ$" in cell:
-                cell= cell.replace("$MCQ$", "").strip()
-                MCQ.append(cell)
-                last_mcq_col = col_index
+    # -----------------------------
+    # STEP 3 — Collect FIB
+    # -----------------------------
+    FIB = []
 
-        # -----------------------------
-        # STEP 3 — Collect FIB
-        # -----------------------------
-        FIB = []
+    if last_mcq_col is not None:
+        for col_index in range(last_mcq_col + 1, len(row)):
+            cell = str(row[col_index]).strip()
 
-        if last_mcq_col is not None:
-            for col_index in range(last_mcq_col + 1, len(row)):
-                cell = str(row[col_index]).strip()
+            if not cell:
+                break
 
-                if not cell:
-                    break
+            if "$FIB$" in cell:
+                cell = cell.replace("$FIB$", "").strip()
+                FIB.append(cell)
 
-                if "$FIB$" in cell:
-                    cell = cell.replace("$FIB$", "").strip()
-                    FIB.append(cell)
+    if not FIB:
+        return None  # cannot build cloze without answer
 
-        # -----------------------------
-        # STEP 4 — Print debug
-        # -----------------------------
-        #print("\nRow:", row_index)
-        #print("QuestionMoodle:\n", QuestionMoodle)
-        #print("MCQ:", MCQ)
-        #print("FIB:", FIB)
+    # -----------------------------
+    # STEP 4 — Build Cloze
+    # -----------------------------
+    cloze = "{="
 
-        if not FIB:
-            continue  # cannot build cloze without answer
+    # Add answer first
+    cloze += FIB[0]
 
-        # -----------------------------
-        # STEP 5 — Build Cloze
-        # -----------------------------
-        cloze = "{="
+    # Add MCQ distractors
+    for option in MCQ:
+        if option != FIB[0]:
+            cloze += " ~" + option
 
-        # Add answer first
-        cloze += FIB[0]
+    cloze += "}"
 
-        # Add MCQ distractors
-        for option in MCQ:
-            if option != FIB[0]:
-                cloze += " ~" + option
+    #print("Raw Cloze:", cloze)
 
-        cloze += "}"
+    # Replace Blankspace
+    QuestionMoodle = QuestionMoodle.replace("$Blankspace$", cloze)
 
-        print("Raw Cloze:", cloze)
+    # -----------------------------
+    # Convert to GIFT entry
+    # -----------------------------
+    return f"::{row_index}:: {QuestionMoodle}\n"
 
 
-        # Replace Blankspace
-        QuestionMoodle = QuestionMoodle.replace("$Blankspace$", cloze)
+def process_4gift(data):
+    gift_output = []
 
-        # -----------------------------
-        # Convert to GIFT entry
-        # -----------------------------
-        gift_question = f"::{row_index}:: {QuestionMoodle}\n"
+    for row_index, row in enumerate(data):
+        gift_question = gift_row(row_index, row)
 
-        gift_output.append(gift_question)
+        if gift_question is not None:
+            gift_output.append(gift_question)
 
     return gift_output
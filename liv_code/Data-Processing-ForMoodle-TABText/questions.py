@@ -0,0 +1,131 @@
+"""
+Single-pass question tokenizer.
+
+Each row is scanned once into a Question object: a cell is split on the
+" / " MCQ separators, then one compiled regex blanks the {{c1::...}}
+clozes of the parts that have any. The GIFT text is built from the
+Question directly; the $MCQ$ / $FIB$ / $Blankspace$ marker row (the
+_out.csv format) is only rendered when a debug file is written.
+
+Same results as process_mcq -> process_cloze -> process_4gift:
+- a cell is split on " / " first, so a cloze never spans a separator
+- every column is tokenized, the first one is the id
+- the question text runs up to the first cell with a marker
+- answers are only used when MCQ options follow that cell
+"""
+
+import re
+from dataclasses import dataclass, field
+
+BLANK_TOKEN = "$Blankspace$"
+MCQ_MARK = "$MCQ$"
+FIB_MARK = "$FIB$"
+
+SEPARATOR = " / "
+CLOZE_PATTERN = re.compile(r"\{\{c1::(.*?)\}\}", re.DOTALL)
+
+TEXT = "text"
+MCQ = "mcq"
+
+
+@dataclass
+class Cell:
+    text: str           # clozes replaced by BLANK_TOKEN
+    kind: str = TEXT    # TEXT or MCQ (one option of a " / " cell)
+
+    def marked(self):
+        """Text as it appears in the _out.csv marker row."""
+        return self.text + MCQ_MARK if self.kind == MCQ else self.text
+
+    def ends_question(self):
+        return self.kind == MCQ or "$" in self.text
+
+
+@dataclass
+class Question:
+    row_index: int
+    cells: list = field(default_factory=list)      # Cell per column / option
+    answers: list = field(default_factory=list)    # cloze answers in order
+
+    def to_row(self):
+        """The _out.csv marker row for this question."""
+        return [cell.marked() for cell in self.cells] + [FIB_MARK + a for a in self.answers]
+
+    def options(self, after):
+        """MCQ option texts in the cells after index `after`, up to an empty one."""
+        options = []
+        for cell in self.cells[after + 1:]:
+            if cell.kind == MCQ:
+                options.append(cell.text)   # already stripped, never empty
+            elif not cell.text.strip():
+                break
+        return options
+
+
+def blank_clozes(text, answers):
+    """Replace each {{c1::...}} with BLANK_TOKEN, appending its answer."""
+    if "{{" not in text:
+        return text     # most cells: no regex at all
+
+    def blank(match):
+        answers.append(match.group(1))
+        return BLANK_TOKEN
+
+    return CLOZE_PATTERN.sub(blank, text)
+
+
+def tokenize_cell(cell, cells, answers, separator=SEPARATOR):
+    """
+    Append the Cell(s) of one cell to `cells`, its cloze answers to `answers`.
+    """
+    parts = cell.split(separator)
+
+    if len(parts) == 1:
+        cells.append(Cell(blank_clozes(cell, answers)))
+        return
+
+    for part in parts:
+        part = blank_clozes(part, answers).strip()
+        if part:
+            cells.append(Cell(part, MCQ))
+
+
+def parse_question(row_index, row, separator=SEPARATOR):
+    """A cleaned TAB row -> Question. `separator` splits MCQ options."""
+    question = Question(row_index)
+
+    for cell in row:
+        tokenize_cell(cell, question.cells, question.answers, separator)
+
+    return question
+
+
+def question_to_gift(question):
+    """
+    GIFT entry for a Question, or None when it has no blank / no answer.
+    """
+    cells = question.cells
+
+    # ---- Question text: columns after the id, up to the first marker ----
+    question_parts = []
+    end = None
+
+    for index in range(1, len(cells)):
+        question_parts.append(cells[index].marked().strip())
+        if cells[index].ends_question():
+            end = index
+            break
+
+    if end is None:
+        return None  # no blank / option in the question
+
+    # ---- Options after it; the answers only count when there are options ----
+    options = question.options(end)
+    if not options or not question.answers:
+        return None
+
+    answer = question.answers[0].strip()
+    cloze = "{=" + answer + "".join(" ~" + option for option in options if option != answer) + "}"
+
+    text = "\n".join(question_parts).replace(BLANK_TOKEN, cloze)
+    return f"::{question.row_index}:: {text}\n"
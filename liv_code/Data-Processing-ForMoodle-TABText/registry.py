@@ -0,0 +1,104 @@
+"""
+Processor registry.
+
+Which processor pipeline handles which english_N file, declared in one
+place. Files with the same question type share one pipeline (a module
+plus parameters) instead of each having a copied processors/english_N.py.
+
+A pipeline is resolved once: its module is imported and its functions
+looked up on first use and cached, so dispatch is two dict lookups
+however many files there are.
+
+    python main.py --list-processors
+"""
+
+import importlib
+from dataclasses import dataclass, field
+from functools import lru_cache, partial
+
+
+@dataclass(frozen=True)
+class PipelineSpec:
+    module: str
+    description: str
+    params: dict = field(default_factory=dict)   # keyword arguments for parse_question
+
+
+# ---------- PIPELINES ----------
+PIPELINES = {
+    "grammar": PipelineSpec(
+        module="processors.grammar",
+        description="MCQ options split on ' / ' + {{c1::}} cloze -> GIFT",
+        params={"separator": " / "},
+    ),
+    "single_cloze": PipelineSpec(
+        module="processors.english_1",
+        description="first {{c1::}} cloze per cell (list functions only)",
+    ),
+}
+
+# ---------- FILES: english_N -> pipeline ----------
+FILES = {
+    1: "single_cloze",
+    2: "grammar",
+    4: "grammar",
+}
+
+# Functions a pipeline module may define (list API, then row API)
+FUNCTION_NAMES = (
+    "process",
+    "process_mcq",
+    "process_cloze",
+    "process_4gift",
+    "mcq_row",
+    "cloze_row",
+    "gift_row",
+    "parse_question",
+    "question_to_gift",
+)
+
+
+class Processor:
+    """A resolved pipeline: its module's functions, parameters applied."""
+
+    def __init__(self, name, spec):
+        self.name = name
+        self.spec = spec
+        module = importlib.import_module(spec.module)
+
+        self.functions = {}
+        for function_name in FUNCTION_NAMES:
+            fn = getattr(module, function_name, None)
+            if fn is None:
+                continue
+            if function_name == "parse_question" and spec.params:
+                fn = partial(fn, **spec.params)
+                fn.__name__ = function_name     # pipeline stage names
+            self.functions[function_name] = fn
+
+    def get(self, function_name):
+        """The function, or None when this pipeline doesn't have it."""
+        return self.functions.get(function_name)
+
+    def has(self, *function_names):
+        return all(name in self.functions for name in function_names)
+
+
+@lru_cache(maxsize=None)
+def resolve_pipeline(name):
+    """Processor for a pipeline name (KeyError if unknown), built once."""
+    return Processor(name, PIPELINES[name])
+
+
+def resolve(file_number):
+    """Processor registered for english_N, or None."""
+    name = FILES.get(file_number)
+    return resolve_pipeline(name) if name is not None else None
+
+
+def describe():
+    """[(name, spec, file numbers)] for listing the registry."""
+    files = {}
+    for file_number, name in sorted(FILES.items()):
+        files.setdefault(name, []).append(file_number)
+    return [(name, spec, files.get(name, [])) for name, spec in PIPELINES.items()]
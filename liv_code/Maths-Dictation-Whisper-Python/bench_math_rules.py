@@ -0,0 +1,94 @@
+"""
+Microbenchmark spoken-maths substitution.
+
+Compares the original replace_math_symbols() (16 re.sub calls with
+uncompiled patterns) with MathRules (one compiled alternation and a
+dispatch dict), on short dictated segments and on one long text.
+Outputs are checked to be identical first.
+
+Usage:
+    python bench_math_rules.py [repeats]
+"""
+
+import random
+import re
+import sys
+import time
+
+from math_rules import MathRules, RULES_FILE
+
+
+def legacy_replace_math_symbols(text):
+    text = text.lower()
+
+    replacements = [
+        (r"\bflat\s+divide\b", "÷"),
+        (r"\bdivide\b", "/"),
+        (r"\bplus\b", "+"),
+        (r"\bminus\b", "-"),
+        (r"\btimes\b", r"\\times"),
+        (r"\bequals\b", "="),
+        (r"\balpha\b|\balfa\b", r"\\alpha"),
+        (r"\bbeta\b", r"\\beta"),
+        (r"\bgamma\b", r"\\gamma"),
+        (r"\btheta\b", r"\\theta"),
+        (r"\blambda\b", r"\\lambda"),
+        (r"\bpi\b", r"\\pi"),
+        (r"\bsquared\b", "^2"),
+        (r"\bcubed?\b", "^3"),
+        (r"\bintegral\b", r"\\int"),
+        (r"\bsigma\b", r"\\sigma"),
+    ]
+
+    for pattern, replacement in replacements:
+        text = re.sub(pattern, replacement, text)
+
+    return text.strip()
+
+
+WORDS = (
+    "x y two three four of the and then flat divide divide plus minus times "
+    "equals alpha alfa beta gamma theta lambda pi squared cube cubed integral sigma"
+).split()
+
+
+def make_segments(count, length=14, seed=0):
+    rng = random.Random(seed)
+    return [" ".join(rng.choice(WORDS) for _ in range(length)).capitalize() for _ in range(count)]
+
+
+def timed(label, fn, texts, repeats):
+    start = time.perf_counter()
+    for _ in range(repeats):
+        for text in texts:
+            fn(text)
+    per_call_us = (time.perf_counter() - start) * 1e6 / (repeats * len(texts))
+    print(f"{label:<34}{per_call_us:>10.2f} us/text")
+    return per_call_us
+
+
+def main():
+    repeats = int(sys.argv[1]) if len(sys.argv) > 1 else 20
+
+    rules = MathRules.from_file(RULES_FILE)
+    segments = make_segments(500)
+    long_text = [" ".join(make_segments(200, seed=1))]
+
+    for text in segments + long_text:
+        assert rules.apply(text) == legacy_replace_math_symbols(text), text
+
+    print(f"\n{len(rules.replacements)} phrases, outputs identical\n")
+
+    print(f"segments ({len(segments)} x 14 words)")
+    base = timed("  16 x re.sub (current)", legacy_replace_math_symbols, segments, repeats)
+    new = timed("  one alternation + dispatch", rules.apply, segments, repeats)
+    print(f"  speedup: {base / new:.1f}x\n")
+
+    print("one long text (2800 words)")
+    base = timed("  16 x re.sub (current)", legacy_replace_math_symbols, long_text, repeats)
+    new = timed("  one alternation + dispatch", rules.apply, long_text, repeats)
+    print(f"  speedup: {base / new:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
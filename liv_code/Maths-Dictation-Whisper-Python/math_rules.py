@@ -0,0 +1,91 @@
+import os
+import re
+from pathlib import Path
+
+RULES_FILE = Path(__file__).with_name("math_rules.txt")
+
+
+def normalize_phrase(phrase):
+    return " ".join(phrase.lower().split())
+
+
+def parse_rules(lines):
+    """
+    Rules file lines -> [(phrase, replacement), ...] in file order.
+    "alpha | alfa => \\alpha" gives one entry per spelling.
+    """
+    rules = []
+    for number, line in enumerate(lines, 1):
+        line = line.strip()
+        if not line or line.startswith("#"):
+            continue
+
+        spoken, sep, replacement = line.partition("=>")
+        if not sep or not spoken.strip():
+            raise ValueError(f"Rule line {number}: expected 'words => replacement', got {line!r}")
+
+        for phrase in spoken.split("|"):
+            phrase = normalize_phrase(phrase)
+            if phrase:
+                rules.append((phrase, replacement.strip()))
+    return rules
+
+
+class MathRules:
+    """
+    All spoken-maths rules as one compiled alternation plus a dispatch dict.
+
+    One regex scan per text instead of one re.sub per rule. Alternatives
+    are ordered longest phrase first (stable, so file order breaks ties),
+    which makes "flat divide" win over "divide" at the same position.
+    Replacements are not rescanned, so a produced "\\times" can't be hit
+    by a later rule.
+    """
+
+    def __init__(self, rules):
+        self.replacements = {}
+        for phrase, replacement in rules:
+            self.replacements.setdefault(phrase, replacement)   # first rule wins
+
+        phrases = sorted(self.replacements, key=lambda p: (-len(p.split()), -len(p)))
+        alternation = "|".join(r"\s+".join(map(re.escape, p.split())) for p in phrases)
+        self.pattern = re.compile(rf"\b(?:{alternation})\b") if phrases else None
+
+    @classmethod
+    def from_file(cls, path=RULES_FILE):
+        with open(path, encoding="utf-8") as f:
+            return cls(parse_rules(f))
+
+    def _replace(self, match):
+        return self.replacements[normalize_phrase(match.group(0))]
+
+    def apply(self, text):
+        text = text.lower()
+        if self.pattern is not None:
+            text = self.pattern.sub(self._replace, text)
+        return text.strip()
+
+
+class RulesFile:
+    """
+    MathRules from a file, rebuilt when the file's mtime changes so edits
+    take effect without restarting the dictation.
+    """
+
+    def __init__(self, path=RULES_FILE):
+        self.path = Path(path)
+        self._mtime = None
+        self.rules = None
+        self.current()
+
+    def current(self):
+        mtime = os.stat(self.path).st_mtime_ns
+        if mtime != self._mtime:
+            try:
+                self.rules = MathRules.from_file(self.path)
+            except ValueError as e:
+                if self.rules is None:
+                    raise
+                print(f"[Keeping previous math rules: {e}]")
+            self._mtime = mtime
+        return self.rules
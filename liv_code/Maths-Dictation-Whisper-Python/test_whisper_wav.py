@@ -1,33 +1,331 @@
-import whisper
+"""
+Whisper benchmark: which backend / model / settings to deploy.
+
+Runs every WAV in a directory through each combination of
+backend x model size x compute type x beam size x CPU threads and reports
+model load time, real-time factor (decode time / audio length), peak RSS
+and WER against reference transcripts.
+
+Reference transcripts sit next to the audio: maths1.wav + maths1.txt.
+A language code before .wav sets the language per file (greeting.hi.wav,
+greeting.hi.txt); other files use --language. Files without a .txt are
+timed but get no WER.
+
+Each combination runs in a fresh child process, so load time and peak
+RSS are not affected by the models loaded before it.
+
+Usage:
+    python test_whisper_wav.py                  # Math-test.wav with openai-whisper small, as before
+    python test_whisper_wav.py refs/ --backends faster-whisper --models small,medium \\
+        --compute-types int8,float32 --beams 1,5 --threads 4,8 --csv results.csv
+"""
+
+import argparse
+import csv
+import itertools
+import json
+import re
+import subprocess
+import sys
 import time
+import unicodedata
+import wave
+from pathlib import Path
+
+import numpy as np
+
+SAMPLE_RATE = 16000
+HERE = Path(__file__).parent
+
+BACKENDS = ("faster-whisper", "openai-whisper")
+# openai-whisper on CPU only runs float32 (fp16=False)
+COMPUTE_TYPES = {
+    "faster-whisper": {"int8", "int8_float32", "int8_float16", "float16", "float32"},
+    "openai-whisper": {"float32"},
+}
+
+INITIAL_PROMPT = """
+This is mathematics dictation.
+Common words: alpha, beta, gamma, plus, minus, divide,
+flat divide, integral, sigma, theta, lambda, equals.
+"""
+
+# --prompt name -> {clip language: initial_prompt}; other languages get none
+PROMPTS = {
+    "none": {},
+    "maths": {"en": INITIAL_PROMPT},
+}
+
+
+# ---------- AUDIO + REFERENCES ----------
+def find_clips(target, default_language):
+    """
+    [{path, language, reference}] for a WAV file or a directory of them.
+    """
+    target = Path(target)
+    paths = sorted(target.glob("*.wav")) if target.is_dir() else [target]
+
+    clips = []
+    for path in paths:
+        stem = path.stem
+        language = default_language
+        if re.fullmatch(r".+\.[a-z]{2}", stem):
+            language = stem.rsplit(".", 1)[1]
+
+        reference = path.with_suffix(".txt")
+        clips.append({
+            "path": str(path),
+            "language": language,
+            "reference": reference.read_text(encoding="utf-8") if reference.exists() else None,
+        })
+    return clips
+
+
+def load_audio(path):
+    """
+    16 kHz mono float32. PCM WAVs at 16 kHz are read directly, anything
+    else goes through the backend's own ffmpeg/PyAV decoder.
+    """
+    try:
+        with wave.open(path) as w:
+            if w.getframerate() == SAMPLE_RATE and w.getsampwidth() in (2, 4):
+                dtype = "<i2" if w.getsampwidth() == 2 else "<i4"
+                pcm = np.frombuffer(w.readframes(w.getnframes()), dtype=dtype)
+                audio = pcm.reshape(-1, w.getnchannels()).mean(axis=1)
+                return (audio / float(np.iinfo(dtype).max + 1)).astype(np.float32)
+    except wave.Error:
+        pass    # float / WAVE_FORMAT_EXTENSIBLE: the wave module can't read it
+
+    try:
+        from faster_whisper.audio import decode_audio
+        return decode_audio(path, sampling_rate=SAMPLE_RATE)
+    except ImportError:
+        import whisper
+        return whisper.load_audio(path)
+
+
+# ---------- WER ----------
+def normalize_words(text):
+    """
+    Lowercase, punctuation and symbols removed (Devanagari vowel signs kept).
+    """
+    kept = "".join(
+        " " if unicodedata.category(ch)[0] in "PS" else ch
+        for ch in unicodedata.normalize("NFC", text.lower())
+    )
+    return kept.split()
+
+
+def word_errors(reference, hypothesis):
+    """
+    (edits, reference word count): word-level Levenshtein distance.
+    """
+    ref, hyp = normalize_words(reference), normalize_words(hypothesis)
+    row = list(range(len(hyp) + 1))
+    for i, r in enumerate(ref, 1):
+        prev, row[0] = row[0], i
+        for j, h in enumerate(hyp, 1):
+            prev, row[j] = row[j], min(row[j] + 1, row[j - 1] + 1, prev + (r != h))
+    return row[-1], len(ref)
+
+
+# ---------- ONE CONFIGURATION (child process) ----------
+def peak_rss_mb():
+    try:
+        import psutil
+        info = psutil.Process().memory_info()
+        peak = getattr(info, "peak_wset", None)     # Windows
+        if peak is not None:
+            return peak / 2**20
+    except ImportError:
+        pass
+
+    try:
+        import resource
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak / 2**20 if sys.platform == "darwin" else peak / 1024
+    except ImportError:
+        return None
+
+
+def load_model(config):
+    if config["backend"] == "faster-whisper":
+        from faster_whisper import WhisperModel
+        return WhisperModel(
+            config["model"],
+            device="cpu",
+            compute_type=config["compute_type"],
+            cpu_threads=config["threads"],
+        )
+
+    import torch
+    import whisper
+    if config["threads"]:
+        torch.set_num_threads(config["threads"])
+    return whisper.load_model(config["model"], device="cpu")
+
+
+def transcribe(model, config, audio, language):
+    prompt = PROMPTS[config["prompt"]].get(language)
+
+    if config["backend"] == "faster-whisper":
+        segments, _ = model.transcribe(
+            audio,
+            language=language,
+            beam_size=config["beam"],
+            initial_prompt=prompt,
+        )
+        return "".join(segment.text for segment in segments).strip()
+
+    result = model.transcribe(
+        audio,
+        language=language,
+        beam_size=config["beam"] if config["beam"] > 1 else None,
+        initial_prompt=prompt,
+        fp16=False,
+    )
+    return result["text"].strip()
+
+
+def run_config(config, clips):
+    start = time.perf_counter()
+    model = load_model(config)
+    load_seconds = time.perf_counter() - start
+
+    audio_seconds = decode_seconds = 0.0
+    edits = ref_words = 0
+    texts = []
+
+    for clip in clips:
+        audio = load_audio(clip["path"])
+        start = time.perf_counter()
+        text = transcribe(model, config, audio, clip["language"])
+        decode_seconds += time.perf_counter() - start
+        audio_seconds += audio.size / SAMPLE_RATE
+        texts.append(text)
+
+        if clip["reference"] is not None:
+            e, n = word_errors(clip["reference"], text)
+            edits += e
+            ref_words += n
+
+    peak = peak_rss_mb()
+    return {
+        **config,
+        "load_s": round(load_seconds, 2),
+        "audio_s": round(audio_seconds, 2),
+        "decode_s": round(decode_seconds, 2),
+        "rtf": round(decode_seconds / audio_seconds, 3) if audio_seconds else None,
+        "peak_rss_mb": round(peak, 1) if peak is not None else None,
+        "wer": round(edits / ref_words, 4) if ref_words else None,
+        "texts": texts,
+    }
+
+
+# ---------- GRID (parent process) ----------
+def split_list(value, cast=str):
+    return [cast(v.strip()) for v in value.split(",") if v.strip()]
+
+
+def build_configs(args):
+    configs = []
+    for backend, model, compute_type, beam, threads in itertools.product(
+        args.backends, args.models, args.compute_types, args.beams, args.threads
+    ):
+        if backend not in BACKENDS:
+            raise SystemExit(f"Unknown backend {backend!r}, choose from {', '.join(BACKENDS)}")
+        if compute_type not in COMPUTE_TYPES[backend]:
+            print(f"skip: {backend} has no compute type {compute_type}")
+            continue
+        configs.append({
+            "backend": backend,
+            "model": model,
+            "compute_type": compute_type,
+            "beam": beam,
+            "threads": threads,
+            "prompt": args.prompt,
+        })
+    return configs
+
+
+def run_in_child(config, clips):
+    payload = json.dumps({"config": config, "clips": clips})
+    proc = subprocess.run(
+        [sys.executable, __file__, "--worker"],
+        input=payload, capture_output=True, text=True, encoding="utf-8",
+    )
+    if proc.returncode != 0:
+        return {**config, "error": proc.stderr.strip().splitlines()[-1] if proc.stderr.strip() else "failed"}
+    return json.loads(proc.stdout.strip().splitlines()[-1])
+
+
+def fmt(value, spec):
+    return "-" if value is None else format(value, spec)
+
+
+def print_row(result):
+    label = f"{result['backend']} {result['model']} {result['compute_type']} beam={result['beam']} threads={result['threads'] or 'auto'}"
+    if result.get("prompt", "none") != "none":
+        label += f" prompt={result['prompt']}"
+
+    if "error" in result:
+        print(f"{label:<58} ERROR: {result['error']}")
+        return
+    print(
+        f"{label:<58}{fmt(result['load_s'], '>8.2f')}{fmt(result['rtf'], '>8.3f')}"
+        f"{fmt(result['peak_rss_mb'], '>10.0f')}{fmt(result['wer'], '>8.3f')}"
+    )
 
-audio_file = "Math-test.wav"
 
-# start timer
-start = time.time()
+def main():
+    if "--worker" in sys.argv:
+        job = json.loads(sys.stdin.read())
+        print(json.dumps(run_config(job["config"], job["clips"]), ensure_ascii=False))
+        return
 
-# choose model explicitly
-model_name = "small"   # options: tiny, base, small, medium, large
+    parser = argparse.ArgumentParser(description="Benchmark Whisper backends and settings")
+    parser.add_argument("target", nargs="?", default=str(HERE / "Math-test.wav"),
+                        help="WAV file or directory of WAVs (+ .txt references)")
+    parser.add_argument("--backends", type=split_list, default=["openai-whisper"])
+    parser.add_argument("--models", type=split_list, default=["small"])
+    parser.add_argument("--compute-types", type=split_list, default=["float32"])
+    parser.add_argument("--beams", type=lambda v: split_list(v, int), default=[1])
+    parser.add_argument("--threads", type=lambda v: split_list(v, int), default=[0],
+                        help="CPU threads, 0 = library default")
+    parser.add_argument("--language", default="en")
+    parser.add_argument("--prompt", choices=sorted(PROMPTS), default="none",
+                        help="initial_prompt: maths = dictation prompt for English clips (default none)")
+    parser.add_argument("--show-text", action="store_true")
+    parser.add_argument("--csv", help="also write the results to this CSV file")
+    args = parser.parse_args()
 
-# force CPU usage
-model = whisper.load_model(model_name, device="cpu")
+    clips = find_clips(args.target, args.language)
+    if not clips:
+        raise SystemExit(f"No WAV files in {args.target}")
+    with_refs = sum(c["reference"] is not None for c in clips)
+    configs = build_configs(args)
 
-load_time = time.time()
+    print(f"\n{len(clips)} clip(s), {with_refs} with reference text, {len(configs)} configuration(s)\n")
+    print(f"{'configuration':<58}{'load s':>8}{'RTF':>8}{'peak MB':>10}{'WER':>8}")
 
-# transcribe
-result = model.transcribe(
-    audio_file,
-    language="en",
-    fp16=False
-)
+    results = []
+    for config in configs:
+        result = run_in_child(config, clips)
+        results.append(result)
+        print_row(result)
+        if args.show_text and "texts" in result:
+            for clip, text in zip(clips, result["texts"]):
+                print(f"    {Path(clip['path']).name}: {text}")
 
-end = time.time()
+    if args.csv:
+        fields = ["backend", "model", "compute_type", "beam", "threads", "prompt",
+                  "load_s", "audio_s", "decode_s", "rtf", "peak_rss_mb", "wer", "error"]
+        with open(args.csv, "w", newline="", encoding="utf-8") as f:
+            writer = csv.DictWriter(f, fieldnames=fields, extrasaction="ignore")
+            writer.writeheader()
+            writer.writerows(results)
+        print(f"\nWritten {args.csv}")
 
-print("\nTranscription:\n")
-print(result["text"])
 
-print("\nTiming:")
-print("Model:", model_name)
-print("Model load time:", round(load_time - start,2),"sec")
-print("Transcription time:", round(end - load_time,2),"sec")
-print("Total time:", round(end - start,2),"sec")
\ No newline at end of file
+if __name__ == "__main__":
+    main()
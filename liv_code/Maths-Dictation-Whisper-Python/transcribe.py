@@ -1,19 +1,27 @@
+import queue
+import re
+import threading
+
 import numpy as np
 import sounddevice as sd
-import re
 from faster_whisper import WhisperModel
 
+from math_rules import RULES_FILE, RulesFile
+
 # ---------- SETTINGS ----------
 MODEL_SIZE = "medium"
 SAMPLE_RATE = 16000
-CHUNK_DURATION = 4
-# ------------------------------
+BEAM_SIZE = 7
 
-print("Loading Whisper model...")
-model = WhisperModel(
-    MODEL_SIZE,
-    compute_type="int8"
-)
+RING_SECONDS = 60       # capture buffer, the decoder may fall this far behind
+BLOCK_SECONDS = 0.1     # microphone callback size
+FRAME_MS = 30           # VAD frame
+MIN_RMS = 0.004         # VAD: never treat quieter frames as speech
+PAUSE_SECONDS = 0.5     # a pause this long closes a piece of speech
+MAX_WINDOW = 8.0        # longest audio decoded at once, bounds the latency
+OVERLAP = 1.0           # audio decoded twice when a window is cut mid-speech
+MIN_SPEECH = 0.3        # shorter bursts (clicks, coughs) are not decoded
+# ------------------------------
 
 INITIAL_PROMPT = """
 This is mathematics dictation.
@@ -21,81 +29,266 @@ Common words: alpha, beta, gamma, plus, minus, divide,
 flat divide, integral, sigma, theta, lambda, equals.
 """
 
+# Spoken-maths rules, edit math_rules.txt to change them
+math_rules = RulesFile(RULES_FILE)
+
+
 def replace_math_symbols(text):
-    text = text.lower()
-
-    replacements = [
-        (r"\bflat\s+divide\b", "÷"),
-        (r"\bdivide\b", "/"),
-        (r"\bplus\b", "+"),
-        (r"\bminus\b", "-"),
-        (r"\btimes\b", r"\\times"),
-        (r"\bequals\b", "="),
-        (r"\balpha\b|\balfa\b", r"\\alpha"),
-        (r"\bbeta\b", r"\\beta"),
-        (r"\bgamma\b", r"\\gamma"),
-        (r"\btheta\b", r"\\theta"),
-        (r"\blambda\b", r"\\lambda"),
-        (r"\bpi\b", r"\\pi"),
-        (r"\bsquared\b", "^2"),
-        (r"\bcubed?\b", "^3"),
-        (r"\bintegral\b", r"\\int"),
-        (r"\bsigma\b", r"\\sigma"),
-    ]
-
-    for pattern, replacement in replacements:
-        text = re.sub(pattern, replacement, text)
-
-    return text.strip()
-
-
-print("\nControlled Math Dictation Started.")
-print('Say "period" to finalize a segment.')
-print('Say "stop" to exit.\n')
-
-buffer_text = ""
-
-try:
-    while True:
-        print("Listening...")
-
-        audio = sd.rec(
-            int(CHUNK_DURATION * SAMPLE_RATE),
-            samplerate=SAMPLE_RATE,
-            channels=1,
-            dtype="float32"
-        )
-        sd.wait()
-        audio = np.squeeze(audio)
+    return math_rules.current().apply(text)
+
+
+# ---------- CAPTURE ----------
+class RingBuffer:
+    """
+    Preallocated float32 capture buffer written by the audio callback.
+
+    Positions are absolute sample counts since the start, the decoder
+    reads any range that is still within the last `capacity` samples.
+    """
+
+    def __init__(self, capacity):
+        self.capacity = capacity
+        self.data = np.zeros(capacity, dtype=np.float32)
+        self.written = 0
+        self._cond = threading.Condition()
+
+    def write(self, samples):
+        samples = samples[-self.capacity:]
+        n = samples.size
+        with self._cond:
+            start = self.written % self.capacity
+            first = min(n, self.capacity - start)
+            self.data[start:start + first] = samples[:first]
+            self.data[:n - first] = samples[first:]
+            self.written += n
+            self._cond.notify_all()
+
+    def wait_for(self, position, timeout):
+        """
+        Block until `position` samples were written (or timeout), return the count.
+        """
+        with self._cond:
+            self._cond.wait_for(lambda: self.written >= position, timeout)
+            return self.written
+
+    def read(self, start, end):
+        with self._cond:
+            if start < self.written - self.capacity or end > self.written:
+                raise ValueError("range no longer (or not yet) in the buffer")
+            i, j = start % self.capacity, end % self.capacity
+            if i < j or start == end:
+                return self.data[i:j].copy()
+            return np.concatenate([self.data[i:], self.data[:j]])
+
+
+# ---------- VAD ----------
+class PauseFinder:
+    """
+    Energy VAD over a window: is there speech, and where is the last pause.
+    The noise floor drops to the quietest frames at once and rises slowly,
+    only from frames that were not speech.
+    """
+
+    def __init__(self):
+        self.frame_len = SAMPLE_RATE * FRAME_MS // 1000
+        self.pause_frames = int(PAUSE_SECONDS * 1000 / FRAME_MS)
+        self.noise_floor = MIN_RMS / 3
+
+    def voiced(self, audio):
+        n = audio.size // self.frame_len
+        frames = audio[:n * self.frame_len].reshape(n, self.frame_len)
+        rms = np.sqrt(np.mean(frames * frames, axis=1))
+
+        if n == 0:
+            return np.zeros(0, dtype=bool)
+
+        self.noise_floor = min(self.noise_floor, float(np.percentile(rms, 10)))
+        voiced = rms > max(MIN_RMS, 3.0 * self.noise_floor)
+        if not voiced.all():
+            self.noise_floor = 0.9 * self.noise_floor + 0.1 * float(np.mean(rms[~voiced]))
+        return voiced
+
+    def last_pause(self, voiced):
+        """
+        Sample index in the middle of the last pause that follows speech, or None.
+        """
+        idx = np.flatnonzero(voiced)
+        if idx.size == 0:
+            return None
+
+        # Gaps between voiced frames, plus the trailing one
+        starts = np.append(idx[:-1] + 1, idx[-1] + 1)
+        ends = np.append(idx[1:], voiced.size)
+        long_gaps = np.flatnonzero(ends - starts >= self.pause_frames)
+        if long_gaps.size == 0:
+            return None
+
+        g = long_gaps[-1]
+        return (starts[g] + ends[g]) // 2 * self.frame_len
+
+
+def normalize_word(word):
+    """Lowercase, punctuation removed: 'Alpha,' and 'alpha' match."""
+    return re.sub(r"[^\w]", "", word.lower())
 
-        segments, _ = model.transcribe(
+
+def merge_overlap(previous_words, text, max_words=8):
+    """
+    Drop the words at the start of `text` that repeat the end of the previous
+    window (that audio was decoded twice).
+    """
+    words = text.split()
+    prev = [normalize_word(w) for w in previous_words[-max_words:]]
+    new = [normalize_word(w) for w in words[:max_words]]
+
+    for k in range(min(len(prev), len(new)), 0, -1):
+        if prev[-k:] == new[:k]:
+            return " ".join(words[k:])
+    return text
+
+
+# ---------- DECODER ----------
+class Decoder(threading.Thread):
+    """
+    Consumer: takes audio from the ring buffer and decodes it piece by piece.
+
+    A piece ends at a pause (VAD). Speech without a pause is cut at
+    MAX_WINDOW and the next window starts OVERLAP earlier, the repeated
+    words are removed by merge_overlap(). Finished texts go to `texts`
+    as (text, latency seconds).
+    """
+
+    def __init__(self, model, ring, texts, stop_event):
+        super().__init__(name="decoder", daemon=True)
+        self.model = model
+        self.ring = ring
+        self.texts = texts
+        self.stop_event = stop_event
+        self.vad = PauseFinder()
+
+    def decode(self, audio):
+        segments, _ = self.model.transcribe(
             audio,
             language="en",
             initial_prompt=INITIAL_PROMPT,
-            beam_size=7
+            beam_size=BEAM_SIZE
         )
+        return "".join(segment.text for segment in segments).strip()
+
+    def emit(self, text, audio_end):
+        if text:
+            latency = (self.ring.written - audio_end) / SAMPLE_RATE
+            self.texts.put((text, latency))
+
+    def run(self):
+        step = int(0.5 * SAMPLE_RATE)
+        max_window = int(MAX_WINDOW * SAMPLE_RATE)
+        overlap = int(OVERLAP * SAMPLE_RATE)
+        min_speech_frames = int(MIN_SPEECH * 1000 / FRAME_MS)
+
+        start = 0       # first sample not decoded yet
+        seen = 0        # end of the last window looked at
+        carried = []    # words of a window that was cut mid-speech
+
+        while not self.stop_event.is_set():
+            now = self.ring.wait_for(seen + step, timeout=0.5)
+            if now - seen < step:
+                continue
+
+            if now - start > self.ring.capacity - step:
+                print(f"\n[Decoder {(now - start) / SAMPLE_RATE:.0f}s behind, skipping audio]")
+                start = now - max_window
+                carried = []
+
+            end = seen = min(now, start + max_window)
+            audio = self.ring.read(start, end)
+            voiced = self.vad.voiced(audio)
+            cut = self.vad.last_pause(voiced)
+
+            if cut is None and not voiced.any():
+                # Only pause so far, keep a little as lead-in
+                start = max(start, end - int(0.3 * SAMPLE_RATE))
+                carried = []
+                continue
+
+            if cut is not None:
+                if voiced[:cut // self.vad.frame_len].sum() >= min_speech_frames:
+                    self.emit(merge_overlap(carried, self.decode(audio[:cut])), start + cut)
+                start += cut
+                carried = []
+
+            elif end - start >= max_window:
+                text = merge_overlap(carried, self.decode(audio))
+                self.emit(text, end)
+                carried = text.split()
+                start = end - overlap
+
+
+def main():
+    print("Loading Whisper model...")
+    model = WhisperModel(
+        MODEL_SIZE,
+        compute_type="int8"
+    )
+
+    ring = RingBuffer(int(RING_SECONDS * SAMPLE_RATE))
+    texts = queue.Queue()
+    stop_event = threading.Event()
+
+    def audio_callback(indata, frames, time_info, status):
+        if status:
+            print("Audio status:", status)
+        ring.write(indata[:, 0])
+
+    print("\nControlled Math Dictation Started.")
+    print('Say "period" to finalize a segment.')
+    print('Say "stop" to exit.\n')
+
+    buffer_text = ""
+    stream = sd.InputStream(
+        samplerate=SAMPLE_RATE,
+        channels=1,
+        dtype="float32",
+        blocksize=int(BLOCK_SECONDS * SAMPLE_RATE),
+        callback=audio_callback
+    )
+
+    try:
+        with stream:
+            Decoder(model, ring, texts, stop_event).start()
+            print("Listening...")
+
+            while True:
+                try:
+                    text, latency = texts.get(timeout=0.5)
+                except queue.Empty:
+                    continue
+
+                buffer_text += " " + text.lower()
+
+                # ---- Check stop command ----
+                if re.search(r"\bstop\b", buffer_text):
+                    print("\nStopping by voice command.")
+                    break
 
-        for segment in segments:
-            buffer_text += " " + segment.text.lower()
+                # ---- Check period trigger ----
+                while "period" in buffer_text:
+                    before_period, buffer_text = buffer_text.split("period", 1)
 
-        # ---- Check stop command ----
-        if "stop" in buffer_text:
-            print("\nStopping by voice command.")
-            break
+                    processed = replace_math_symbols(before_period)
 
-        # ---- Check period trigger ----
-        if "period" in buffer_text:
-            before_period = buffer_text.split("period")[0]
+                    if processed.strip():
+                        print("\nTranscribed:")
+                        print(processed)
+                        print(f"(latency {latency:.1f}s)")
+                        print("-" * 40)
 
-            processed = replace_math_symbols(before_period)
+    except KeyboardInterrupt:
+        print("\nStopped by user.")
 
-            if processed.strip():
-                print("\nTranscribed:")
-                print(processed)
-                print("-" * 40)
+    finally:
+        stop_event.set()
 
-            # Reset buffer after first period
-            buffer_text = ""
 
-except KeyboardInterrupt:
-    print("\nStopped by user.")
\ No newline at end of file
+if __name__ == "__main__":
+    main()
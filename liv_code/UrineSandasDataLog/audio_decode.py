@@ -0,0 +1,109 @@
+import io
+from typing import Optional
+
+import numpy as np
+
+
+# =========================
+# Upload Formats
+# =========================
+# Content-Type of the /transcribe body -> how it is decoded.
+#   float32: raw little-endian float32 mono PCM (the original format, default)
+#   int16:   raw little-endian int16 mono PCM, half the upload size
+#   opus:    compressed container (WebM/Ogg Opus from MediaRecorder), ~10x smaller
+
+PCM_FLOAT32_TYPES = {"application/octet-stream", "audio/x-float32", "audio/pcm-float32"}
+PCM_INT16_TYPES = {"audio/l16", "audio/x-int16", "audio/pcm", "audio/pcm-s16le"}
+CONTAINER_TYPES = {"audio/webm", "audio/ogg", "audio/opus", "video/webm"}
+
+INT16_SCALE = np.float32(1.0 / 32768.0)
+
+
+class UnsupportedAudio(ValueError):
+    """Content-Type / format the server can't decode (HTTP 415).
+    Malformed bodies of a supported type raise a plain ValueError (400)."""
+
+
+def parse_content_type(header: Optional[str]) -> tuple:
+    """
+    'audio/L16; rate=16000' -> ('audio/l16', {'rate': '16000'})
+    """
+    if not header:
+        return "application/octet-stream", {}
+
+    media_type, *params = header.split(";")
+    options = {}
+    for param in params:
+        name, _, value = param.partition("=")
+        if value:
+            options[name.strip().lower()] = value.strip().strip('"')
+    return media_type.strip().lower(), options
+
+
+def audio_format(media_type: str) -> str:
+    if media_type in PCM_FLOAT32_TYPES:
+        return "float32"
+    if media_type in PCM_INT16_TYPES:
+        return "int16"
+    if media_type in CONTAINER_TYPES:
+        return "opus"
+    raise UnsupportedAudio(f"Unsupported Content-Type: {media_type}")
+
+
+def pcm_to_float32(data: bytes, fmt: str) -> np.ndarray:
+    """
+    Raw PCM bytes -> float32 samples.
+
+    float32 is a read-only view over the request bytes (no copy).
+    int16 is also viewed in place, then scaled in a single pass into the
+    float32 array Whisper needs (one allocation, no temporaries).
+    """
+    if fmt == "float32":
+        if len(data) % 4:
+            raise ValueError("float32 body length is not a multiple of 4")
+        return np.frombuffer(data, dtype="<f4")
+
+    if fmt == "int16":
+        if len(data) % 2:
+            raise ValueError("int16 body length is not a multiple of 2")
+        samples = np.frombuffer(data, dtype="<i2")
+        return np.multiply(samples, INT16_SCALE, dtype=np.float32)
+
+    raise UnsupportedAudio(f"Not a PCM format: {fmt}")
+
+
+def decode_container(data: bytes, sample_rate: int = 16000) -> np.ndarray:
+    """
+    WebM/Ogg (Opus) -> float32 mono at sample_rate.
+    Uses faster-whisper's PyAV decoder, which also downmixes and resamples.
+    """
+    from faster_whisper.audio import decode_audio
+
+    return decode_audio(io.BytesIO(data), sampling_rate=sample_rate)
+
+
+def decode_upload(data: bytes, content_type: Optional[str],
+                  sample_rate: int, target_rate: int = 16000) -> tuple:
+    """
+    Request body + headers -> (float32 samples, their sample rate).
+
+    For raw PCM the rate comes from a 'rate=' Content-Type parameter or
+    the X-Sample-Rate value passed in. Containers carry their own rate and
+    come back already at target_rate.
+    """
+    media_type, options = parse_content_type(content_type)
+    fmt = audio_format(media_type)
+
+    if fmt == "opus":
+        return decode_container(data, target_rate), target_rate
+
+    if "rate" in options:
+        try:
+            sample_rate = int(options["rate"])
+        except ValueError:
+            raise ValueError(f"Invalid rate parameter: {options['rate']}") from None
+
+    if options.get("channels", "1") != "1":
+        raise UnsupportedAudio("Only mono PCM is supported")
+
+    return pcm_to_float32(data, fmt), sample_rate
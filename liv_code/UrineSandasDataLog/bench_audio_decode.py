@@ -0,0 +1,106 @@
+"""
+Benchmark /transcribe upload formats: bytes on the wire and decode time.
+
+Compares the original float32 body (np.frombuffer) with int16 PCM and,
+when PyAV / faster-whisper are installed, an Opus-in-WebM recording of
+the same audio. Also times the 44.1/48 kHz -> 16 kHz resampling stage,
+with the filter kernel built per call vs taken from the cache.
+
+Usage:
+    python bench_audio_decode.py [seconds] [repeats]
+"""
+
+import io
+import sys
+import time
+
+import numpy as np
+
+from audio_decode import decode_upload
+from resample import polyphase_kernel, resample
+
+SAMPLE_RATE = 16000
+
+
+def make_speechlike(seconds: float) -> np.ndarray:
+    """
+    A few harmonics with a syllable-rate envelope plus noise.
+    """
+    t = np.arange(int(seconds * SAMPLE_RATE)) / SAMPLE_RATE
+    voice = sum(np.sin(2 * np.pi * f * t) / k for k, f in enumerate((140, 280, 420, 910), 1))
+    envelope = 0.5 + 0.5 * np.sin(2 * np.pi * 4 * t)
+    noise = 0.01 * np.random.default_rng(0).standard_normal(t.size)
+    return (0.2 * voice * envelope + noise).astype(np.float32)
+
+
+def encode_opus(audio: np.ndarray) -> bytes:
+    import av
+
+    buf = io.BytesIO()
+    with av.open(buf, "w", format="webm") as container:
+        stream = container.add_stream("libopus", rate=48000)
+        stream.bit_rate = 32000
+        frame = av.AudioFrame.from_ndarray(
+            (audio * 32767).astype(np.int16).reshape(1, -1), format="s16", layout="mono"
+        )
+        frame.sample_rate = SAMPLE_RATE
+        for packet in stream.encode(frame):
+            container.mux(packet)
+        for packet in stream.encode(None):
+            container.mux(packet)
+    return buf.getvalue()
+
+
+def timed(label, body, content_type, repeats, base_size):
+    start = time.perf_counter()
+    for _ in range(repeats):
+        audio, _ = decode_upload(body, content_type, SAMPLE_RATE)
+    per_call_ms = (time.perf_counter() - start) * 1000 / repeats
+    print(f"{label:<26}{len(body) / 1024:>10.1f} KB{base_size / len(body):>8.1f}x"
+          f"{per_call_ms:>12.3f} ms")
+    return audio
+
+
+def main():
+    seconds = float(sys.argv[1]) if len(sys.argv) > 1 else 10.0
+    repeats = int(sys.argv[2]) if len(sys.argv) > 2 else 200
+
+    audio = make_speechlike(seconds)
+    float_body = audio.tobytes()
+    int16_body = (np.clip(audio, -1, 1) * 32767).astype("<i2").tobytes()
+
+    print(f"\n{seconds:g} s of 16 kHz mono, {repeats} decodes each\n")
+    print(f"{'format':<26}{'upload':>13}{'smaller':>9}{'decode':>15}")
+
+    timed("float32 (frombuffer)", float_body, "application/octet-stream", repeats, len(float_body))
+    decoded = timed("int16 audio/L16", int16_body, "audio/L16; rate=16000", repeats, len(float_body))
+    print(f"{'':<26}max int16 error vs float32: {np.abs(decoded - audio).max():.5f}")
+
+    try:
+        opus_body = encode_opus(audio)
+        timed("opus audio/webm", opus_body, "audio/webm", max(1, repeats // 20), len(float_body))
+    except ImportError as e:
+        print(f"opus audio/webm           skipped ({e.name} not installed)")
+
+    print(f"\n{'resample to 16 kHz':<26}{'new kernel':>13}{'cached':>12}")
+    for rate in (44100, 48000):
+        t = np.arange(int(seconds * rate)) / rate
+        clip = (0.3 * np.sin(2 * np.pi * 440 * t)).astype(np.float32)
+        runs = max(1, repeats // 20)
+
+        start = time.perf_counter()
+        for _ in range(runs):
+            polyphase_kernel.cache_clear()
+            resample(clip, rate, SAMPLE_RATE)
+        cold_ms = (time.perf_counter() - start) * 1000 / runs
+
+        start = time.perf_counter()
+        for _ in range(runs):
+            resample(clip, rate, SAMPLE_RATE)
+        warm_ms = (time.perf_counter() - start) * 1000 / runs
+
+        print(f"{rate:<26}{cold_ms:>10.1f} ms{warm_ms:>9.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
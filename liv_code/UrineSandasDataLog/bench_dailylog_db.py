@@ -0,0 +1,126 @@
+"""
+Benchmark the SQLite work done by the daily-log routes.
+
+Compares the old per-request connect()/close() on a rollback journal
+against the pooled WAL connections from dailylog_db.
+Runs on temporary copies of activities.db, the real file is never touched.
+
+Usage:
+    python bench_dailylog_db.py [requests] [threads]
+"""
+
+import shutil
+import sqlite3
+import sys
+import tempfile
+import threading
+import time
+from datetime import datetime
+from pathlib import Path
+
+from dailylog_db import ConnectionPool
+
+PROJECT_ROOT = Path(__file__).resolve().parent
+SOURCE_DB = PROJECT_ROOT / "activities.db"
+
+TABLE_QUERY = """
+    SELECT name FROM sqlite_master
+    WHERE type='table' AND name NOT LIKE 'sqlite_%'
+    ORDER BY name
+"""
+
+
+# -------------------------
+# One "request" worth of DB work
+# -------------------------
+def view_request(conn):
+    tables = [r[0] for r in conn.execute(TABLE_QUERY)]
+    assert "Urine" in tables
+    conn.execute(
+        "SELECT SerialNumber, Activity, DateTime FROM Urine "
+        "ORDER BY DateTime DESC LIMIT 20"
+    ).fetchall()
+
+
+def insert_request(conn):
+    tables = [r[0] for r in conn.execute(TABLE_QUERY)]
+    assert "Urine" in tables
+    with conn:
+        conn.execute(
+            "INSERT INTO Urine (Activity, DateTime) VALUES (?, ?)",
+            ("Urine", datetime.now().strftime("%Y-%m-%d %H:%M:%S")),
+        )
+
+
+# -------------------------
+# Strategies
+# -------------------------
+def legacy_runner(db_path):
+    def run(work):
+        conn = sqlite3.connect(db_path)
+        try:
+            work(conn)
+        finally:
+            conn.close()
+    return run, lambda: None
+
+
+def pooled_runner(db_path):
+    pool = ConnectionPool(db_path)
+
+    def run(work):
+        with pool.connection() as conn:
+            work(conn)
+    return run, pool.close_all
+
+
+def measure(run, work, requests, threads):
+    per_thread = max(1, requests // threads)
+
+    def loop():
+        for _ in range(per_thread):
+            run(work)
+
+    workers = [threading.Thread(target=loop) for _ in range(threads)]
+    start = time.perf_counter()
+    for t in workers:
+        t.start()
+    for t in workers:
+        t.join()
+    elapsed = time.perf_counter() - start
+
+    return (per_thread * threads) / elapsed
+
+
+def main():
+    requests = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    threads = int(sys.argv[2]) if len(sys.argv) > 2 else 4
+
+    with tempfile.TemporaryDirectory() as tmp:
+        results = {}
+
+        for name, make_runner in (("before", legacy_runner), ("after", pooled_runner)):
+            db_path = Path(tmp) / f"{name}.db"
+            shutil.copy(SOURCE_DB, db_path)
+
+            run, cleanup = make_runner(db_path)
+            try:
+                results[name] = {
+                    "insert": measure(run, insert_request, requests, 1),
+                    "view": measure(run, view_request, requests, 1),
+                    f"view x{threads} threads": measure(run, view_request, requests, threads),
+                }
+            finally:
+                cleanup()
+
+    print(f"\nDaily-log DB benchmark ({requests} requests per run)\n")
+    print(f"{'Traffic':<22}{'before req/s':>14}{'after req/s':>14}{'speedup':>10}")
+    print("-" * 60)
+    for traffic in results["before"]:
+        before = results["before"][traffic]
+        after = results["after"][traffic]
+        print(f"{traffic:<22}{before:>14.0f}{after:>14.0f}{after / before:>9.1f}x")
+
+
+if __name__ == "__main__":
+    main()
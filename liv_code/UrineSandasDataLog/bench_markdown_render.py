@@ -0,0 +1,79 @@
+"""
+Benchmark markdown rendering of long LLM-style answers.
+
+Compares the old render_markdown() (markdown.markdown() per call) with
+MarkdownRenderer: pooled prebuilt instances (cold, every text new) and
+the content-hash cache (warm, same answer rendered again).
+
+Usage:
+    python bench_markdown_render.py [answers] [repeats]
+"""
+
+import sys
+import time
+
+import markdown
+
+from markdown_render import MARKDOWN_EXTENSIONS, MarkdownRenderer
+
+
+def make_answer(i: int, sections: int = 12) -> str:
+    """
+    Synthetic Gemini-like answer: headings, lists, a table and code.
+    """
+    parts = [f"# Answer {i}\n"]
+    for s in range(sections):
+        parts.append(f"## Step {s + 1}\n")
+        parts.append(
+            f"Press **RB + A** to sprint, then *hold* `LT` to aim. "
+            f"This is paragraph {s} of answer {i} with some more words to "
+            f"make it look like a real, fairly long LLM answer.\n"
+        )
+        parts.append("\n".join(f"- option {k}: do thing {k} ({i}/{s})" for k in range(5)) + "\n")
+        parts.append(
+            "| Input | Controller | Keyboard |\n"
+            "|-------|------------|----------|\n"
+            + "\n".join(f"| act{k} | X{k} | K{k} |" for k in range(4)) + "\n"
+        )
+        parts.append(f"```python\ndef step_{s}(x):\n    return x * {s} + {i}\n```\n")
+    return "\n".join(parts)
+
+
+def timed(label, fn, texts, repeats):
+    start = time.perf_counter()
+    for _ in range(repeats):
+        for text in texts:
+            fn(text)
+    elapsed = time.perf_counter() - start
+    per_call_ms = elapsed * 1000 / (repeats * len(texts))
+    print(f"{label:<34}{per_call_ms:>10.2f} ms/answer")
+    return per_call_ms
+
+
+def main():
+    answers = int(sys.argv[1]) if len(sys.argv) > 1 else 50
+    repeats = int(sys.argv[2]) if len(sys.argv) > 2 else 3
+
+    texts = [make_answer(i) for i in range(answers)]
+    avg_kb = sum(len(t) for t in texts) / len(texts) / 1024
+    print(f"\n{answers} answers, ~{avg_kb:.1f} KB markdown each, {repeats} repeats\n")
+
+    def old(text):
+        return markdown.markdown(text, extensions=MARKDOWN_EXTENSIONS)
+
+    renderer = MarkdownRenderer()
+    assert renderer.convert(texts[0]) == old(texts[0])
+
+    base = timed("markdown.markdown() per call", old, texts, repeats)
+    cold = timed("pooled instance, no cache", renderer.convert, texts, repeats)
+
+    # Fill the cache, as the first render of every answer would
+    for text in texts:
+        renderer.render(text)
+    warm = timed("pooled instance, cached", renderer.render, texts, repeats)
+
+    print(f"\nspeedup: {base / cold:.1f}x uncached, {base / warm:.0f}x cached")
+
+
+if __name__ == "__main__":
+    main()
@@ -22,6 +22,10 @@ CREATE TABLE IF NOT EXISTS Sandas (
 )
 """)
 
+# 3. DateTime indexes (newest-first views and keyset pagination)
+cur.execute("CREATE INDEX IF NOT EXISTS idx_Urine_DateTime ON Urine (DateTime, SerialNumber)")
+cur.execute("CREATE INDEX IF NOT EXISTS idx_Sandas_DateTime ON Sandas (DateTime, SerialNumber)")
+
 conn.commit()
 conn.close()
 
@@ -0,0 +1,577 @@
+import sqlite3
+import threading
+from contextlib import contextmanager
+from datetime import datetime
+from pathlib import Path
+from typing import Optional
+
+
+# =========================
+# Connection tuning
+# =========================
+
+# Applied to every pooled connection when it is opened.
+# journal_mode=WAL is persistent in the db file, the rest are per-connection.
+SQLITE_PRAGMAS = {
+    "journal_mode": "WAL",      # readers no longer wait behind the writer
+    "synchronous": "NORMAL",    # safe with WAL, one fsync per checkpoint
+    "cache_size": -8000,        # negative = KiB, so ~8 MB page cache
+    "mmap_size": 67108864,      # 64 MB memory-mapped reads
+    "temp_store": "MEMORY",
+    "busy_timeout": 5000,       # ms to wait for a lock instead of failing
+}
+
+POOL_SIZE = 8
+
+
+def apply_pragmas(conn: sqlite3.Connection, pragmas: dict = SQLITE_PRAGMAS) -> None:
+    for name, value in pragmas.items():
+        conn.execute(f"PRAGMA {name}={value}")
+
+
+# =========================
+# Connection Pool
+# =========================
+
+class ConnectionPool:
+    """
+    Small fixed-size pool of SQLite connections.
+    Connections are opened lazily, tuned once with SQLITE_PRAGMAS
+    and reused across requests instead of connect()/close() per route.
+
+    Flask's dev server runs every request on a fresh thread,
+    so connections are shared between threads (check_same_thread=False)
+    but only ever used by one thread at a time.
+    """
+
+    def __init__(self, db_path: Path, size: int = POOL_SIZE, pragmas: Optional[dict] = None):
+        self.db_path = Path(db_path)
+        self.size = size
+        self.pragmas = SQLITE_PRAGMAS if pragmas is None else pragmas
+
+        self._idle = []
+        self._opened = 0
+        self._cond = threading.Condition()
+
+    def _open(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.db_path, check_same_thread=False)
+        apply_pragmas(conn, self.pragmas)
+        return conn
+
+    def acquire(self) -> sqlite3.Connection:
+        with self._cond:
+            while not self._idle and self._opened >= self.size:
+                self._cond.wait()
+
+            if self._idle:
+                return self._idle.pop()
+
+            self._opened += 1
+
+        try:
+            return self._open()
+        except Exception:
+            with self._cond:
+                self._opened -= 1
+                self._cond.notify()
+            raise
+
+    def release(self, conn: sqlite3.Connection) -> None:
+        # Never hand a half-finished transaction to the next request
+        if conn.in_transaction:
+            conn.rollback()
+
+        with self._cond:
+            self._idle.append(conn)
+            self._cond.notify()
+
+    @contextmanager
+    def connection(self):
+        conn = self.acquire()
+        try:
+            yield conn
+        finally:
+            self.release(conn)
+
+    def close_all(self) -> None:
+        with self._cond:
+            for conn in self._idle:
+                conn.close()
+            self._opened -= len(self._idle)
+            self._idle.clear()
+
+
+# =========================
+# Table Catalog
+# =========================
+
+# Tables starting with "_" are internal (rollups etc.) and never listed
+TABLE_NAMES_QUERY = """
+    SELECT name FROM sqlite_master
+    WHERE type='table' AND name NOT LIKE 'sqlite_%'
+      AND name NOT LIKE '\\_%' ESCAPE '\\'
+    ORDER BY name
+"""
+
+
+class TableCatalog:
+    """
+    In-process cache of user table names.
+
+    Loaded once, then reloaded only when PRAGMA schema_version moves
+    (any CREATE/DROP/ALTER, also from other processes such as
+    create_2tables.py) or after an explicit invalidate().
+    Validation is a frozenset lookup.
+    Column lists and the primary key column of every table are
+    cached alongside, so queries don't need PRAGMA table_info.
+    """
+
+    def __init__(self):
+        self._names = ()
+        self._name_set = frozenset()
+        self._columns = {}
+        self._keys = {}
+        self._schema_version = None
+        self._lock = threading.Lock()
+
+    def invalidate(self) -> None:
+        with self._lock:
+            self._schema_version = None
+
+    def _refresh(self, conn: sqlite3.Connection) -> None:
+        # schema_version lives in the db header, reading it is one page at most
+        version = conn.execute("PRAGMA schema_version").fetchone()[0]
+        if version == self._schema_version:
+            return
+
+        with self._lock:
+            if version == self._schema_version:
+                return
+            names = tuple(r[0] for r in conn.execute(TABLE_NAMES_QUERY))
+            columns, keys = {}, {}
+            for name in names:
+                info = conn.execute(f"PRAGMA table_info({name})").fetchall()
+                columns[name] = tuple(col[1] for col in info)
+                keys[name] = next((col[1] for col in info if col[5] == 1), None)
+
+            self._columns = columns
+            self._keys = keys
+            self._names = names
+            self._name_set = frozenset(names)
+            self._schema_version = version
+
+    def names(self, conn: sqlite3.Connection) -> list:
+        self._refresh(conn)
+        return list(self._names)
+
+    def contains(self, conn: sqlite3.Connection, name: str) -> bool:
+        self._refresh(conn)
+        return name in self._name_set
+
+    def columns(self, conn: sqlite3.Connection, name: str) -> tuple:
+        self._refresh(conn)
+        return self._columns.get(name, ())
+
+    def key_column(self, conn: sqlite3.Connection, name: str) -> Optional[str]:
+        """
+        INTEGER PRIMARY KEY column of a table
+        (SerialNumber for activity tables, SNo for Memo).
+        """
+        self._refresh(conn)
+        return self._keys.get(name)
+
+
+# =========================
+# DateTime Indexes
+# =========================
+
+def ensure_datetime_indexes(conn: sqlite3.Connection, catalog: TableCatalog) -> list:
+    """
+    Schema migration: index (DateTime, <key>) on every table with a DateTime column.
+    Idempotent, safe to run at every server start and after new tables
+    are added. Returns the names of indexes that were created.
+    """
+    existing = {
+        r[0] for r in conn.execute("SELECT name FROM sqlite_master WHERE type='index'")
+    }
+    created = []
+
+    with conn:
+        for table in catalog.names(conn):
+            key = catalog.key_column(conn, table)
+            if key is None or "DateTime" not in catalog.columns(conn, table):
+                continue
+
+            index_name = f"idx_{table}_DateTime"
+            if index_name in existing:
+                continue
+
+            conn.execute(f"CREATE INDEX {index_name} ON {table} (DateTime, {key})")
+            created.append(index_name)
+
+    if created:
+        catalog.invalidate()
+    return created
+
+
+# =========================
+# Keyset Pagination
+# =========================
+
+PAGE_SIZE = 50
+
+
+def encode_cursor(dt_value: str, key_value: int) -> str:
+    return f"{dt_value}|{key_value}"
+
+
+def decode_cursor(cursor: str) -> tuple:
+    """
+    Inverse of encode_cursor().
+    Raises ValueError for anything that isn't "<DateTime>|<int>".
+    """
+    dt_value, sep, key_value = cursor.rpartition("|")
+    if not sep or not dt_value:
+        raise ValueError(f"Invalid cursor: {cursor!r}")
+    return dt_value, int(key_value)
+
+
+def fetch_page(
+    conn: sqlite3.Connection,
+    table: str,
+    key: str,
+    value_column: str,
+    since: Optional[str] = None,
+    cursor: Optional[str] = None,
+    limit: int = PAGE_SIZE,
+) -> tuple:
+    """
+    One page of rows ordered newest first, as (rows, next_cursor).
+
+    Rows are (key, value_column, DateTime). The cursor is the
+    (DateTime, key) of the last row already shown, so every page is an
+    index range scan of `limit` rows no matter how deep it is.
+    next_cursor is None on the last page.
+    """
+    query = f"SELECT {key}, {value_column}, DateTime FROM {table}"
+    where = []
+    params = []
+
+    if since is not None:
+        where.append("DateTime >= ?")
+        params.append(since)
+
+    if cursor:
+        where.append(f"(DateTime, {key}) < (?, ?)")
+        params.extend(decode_cursor(cursor))
+
+    if where:
+        query += " WHERE " + " AND ".join(where)
+
+    # One extra row tells us whether there is a next page
+    query += f" ORDER BY DateTime DESC, {key} DESC LIMIT ?"
+    params.append(limit + 1)
+
+    rows = conn.execute(query, params).fetchall()
+
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = encode_cursor(rows[-1][2], rows[-1][0])
+
+    return rows, next_cursor
+
+
+# =========================
+# Daily / Hourly Rollups
+# =========================
+
+ROLLUP_SCHEMA = """
+CREATE TABLE IF NOT EXISTS _DailyRollup (
+    TableName TEXT NOT NULL,
+    Day TEXT NOT NULL,
+    Count INTEGER NOT NULL,
+    FirstAt TEXT NOT NULL,
+    LastAt TEXT NOT NULL,
+    PRIMARY KEY (TableName, Day)
+) WITHOUT ROWID;
+
+CREATE TABLE IF NOT EXISTS _HourlyRollup (
+    TableName TEXT NOT NULL,
+    Day TEXT NOT NULL,
+    Hour INTEGER NOT NULL,
+    Count INTEGER NOT NULL,
+    PRIMARY KEY (TableName, Day, Hour)
+) WITHOUT ROWID;
+"""
+
+
+def is_activity_table(conn: sqlite3.Connection, catalog: TableCatalog, name: str) -> bool:
+    """
+    Tables that hold timestamped activity events (Urine, Sandas, ...).
+    Memo has no Activity column and is not rolled up.
+    """
+    columns = catalog.columns(conn, name)
+    return "Activity" in columns and "DateTime" in columns
+
+
+def record_event(conn: sqlite3.Connection, table: str, dt_value: str) -> None:
+    """
+    Add one event to the rollups.
+    Call inside the same transaction as the INSERT into the activity table.
+    dt_value is "YYYY-MM-DD HH:MM:SS".
+    """
+    record_events(conn, table, [dt_value])
+
+
+def record_events(conn: sqlite3.Connection, table: str, dt_values) -> None:
+    daily_rows = [(table, dt[:10], dt, dt) for dt in dt_values]
+    hourly_rows = [(table, dt[:10], int(dt[11:13])) for dt in dt_values]
+
+    conn.executemany(
+        """
+        INSERT INTO _DailyRollup (TableName, Day, Count, FirstAt, LastAt)
+        VALUES (?, ?, 1, ?, ?)
+        ON CONFLICT (TableName, Day) DO UPDATE SET
+            Count = Count + 1,
+            FirstAt = min(FirstAt, excluded.FirstAt),
+            LastAt = max(LastAt, excluded.LastAt)
+        """,
+        daily_rows,
+    )
+    conn.executemany(
+        """
+        INSERT INTO _HourlyRollup (TableName, Day, Hour, Count)
+        VALUES (?, ?, ?, 1)
+        ON CONFLICT (TableName, Day, Hour) DO UPDATE SET Count = Count + 1
+        """,
+        hourly_rows,
+    )
+
+
+def rebuild_rollups(conn: sqlite3.Connection, table: str) -> None:
+    """
+    Recompute the rollups of one table from its rows.
+    """
+    with conn:
+        conn.execute("DELETE FROM _DailyRollup WHERE TableName = ?", (table,))
+        conn.execute("DELETE FROM _HourlyRollup WHERE TableName = ?", (table,))
+        conn.execute(
+            f"""
+            INSERT INTO _DailyRollup (TableName, Day, Count, FirstAt, LastAt)
+            SELECT ?, substr(DateTime, 1, 10), COUNT(*), MIN(DateTime), MAX(DateTime)
+            FROM {table} WHERE DateTime IS NOT NULL
+            GROUP BY substr(DateTime, 1, 10)
+            """,
+            (table,),
+        )
+        conn.execute(
+            f"""
+            INSERT INTO _HourlyRollup (TableName, Day, Hour, Count)
+            SELECT ?, substr(DateTime, 1, 10), CAST(substr(DateTime, 12, 2) AS INTEGER), COUNT(*)
+            FROM {table} WHERE DateTime IS NOT NULL
+            GROUP BY 2, 3
+            """,
+            (table,),
+        )
+
+
+def ensure_rollups(conn: sqlite3.Connection, catalog: TableCatalog) -> list:
+    """
+    Create the rollup tables and backfill any activity table whose
+    rollup count no longer matches its row count (first run, or rows
+    written by another server variant). Returns the rebuilt tables.
+    """
+    with conn:
+        conn.executescript(ROLLUP_SCHEMA)
+    catalog.invalidate()
+
+    rebuilt = []
+    for table in catalog.names(conn):
+        if not is_activity_table(conn, catalog, table):
+            continue
+
+        rows = conn.execute(
+            f"SELECT COUNT(*) FROM {table} WHERE DateTime IS NOT NULL"
+        ).fetchone()[0]
+        rolled = conn.execute(
+            "SELECT COALESCE(SUM(Count), 0) FROM _DailyRollup WHERE TableName = ?",
+            (table,),
+        ).fetchone()[0]
+
+        if rows != rolled:
+            rebuild_rollups(conn, table)
+            rebuilt.append(table)
+
+    return rebuilt
+
+
+def activity_stats(conn: sqlite3.Connection, table: str, since_day: str) -> dict:
+    """
+    Frequency and interval figures for one table from since_day on,
+    read from the rollups only (one row per day / per active hour).
+    """
+    days = conn.execute(
+        """
+        SELECT Day, Count, FirstAt, LastAt FROM _DailyRollup
+        WHERE TableName = ? AND Day >= ?
+        ORDER BY Day
+        """,
+        (table, since_day),
+    ).fetchall()
+
+    hours = conn.execute(
+        """
+        SELECT Hour, SUM(Count) FROM _HourlyRollup
+        WHERE TableName = ? AND Day >= ?
+        GROUP BY Hour
+        """,
+        (table, since_day),
+    ).fetchall()
+
+    total = sum(d[1] for d in days)
+    window_days = (datetime.now().date() - datetime.strptime(since_day, "%Y-%m-%d").date()).days + 1
+
+    per_week = {}
+    for day, count, _, _ in days:
+        year, week, _ = datetime.strptime(day, "%Y-%m-%d").isocalendar()
+        week_key = f"{year}-W{week:02d}"
+        per_week[week_key] = per_week.get(week_key, 0) + count
+
+    # Events are ordered in time, so the mean gap is simply
+    # (last - first) / (n - 1) over the whole window.
+    avg_gap_minutes = None
+    if total > 1:
+        first = datetime.strptime(days[0][2], "%Y-%m-%d %H:%M:%S")
+        last = datetime.strptime(days[-1][3], "%Y-%m-%d %H:%M:%S")
+        avg_gap_minutes = round((last - first).total_seconds() / 60 / (total - 1), 1)
+
+    per_hour = [0] * 24
+    for hour, count in hours:
+        per_hour[hour] = count
+
+    return {
+        "total": total,
+        "active_days": len(days),
+        "avg_per_day": round(total / window_days, 2) if window_days > 0 else 0,
+        "avg_per_active_day": round(total / len(days), 2) if days else 0,
+        "avg_gap_minutes": avg_gap_minutes,
+        "first": days[0][2] if days else None,
+        "last": days[-1][3] if days else None,
+        "per_day": {d[0]: d[1] for d in days},
+        "per_week": per_week,
+        "per_hour": per_hour,
+    }
+
+
+# =========================
+# Batched / Idempotent Inserts
+# =========================
+
+MAX_BATCH_EVENTS = 1000
+
+EVENT_ID_SCHEMA = """
+CREATE TABLE IF NOT EXISTS _BatchEventIds (
+    EventId TEXT PRIMARY KEY,
+    TableName TEXT NOT NULL,
+    DateTime TEXT NOT NULL,
+    ReceivedAt TEXT NOT NULL DEFAULT (datetime('now', 'localtime'))
+) WITHOUT ROWID;
+"""
+
+
+def ensure_event_ids(conn: sqlite3.Connection, catalog: TableCatalog) -> None:
+    with conn:
+        conn.executescript(EVENT_ID_SCHEMA)
+    catalog.invalidate()
+
+
+def validate_events(conn: sqlite3.Connection, catalog: TableCatalog, events) -> list:
+    """
+    Check a client batch and normalise it to (event_id, table, DateTime).
+    Raises ValueError naming the first bad event, so nothing is
+    written unless the whole batch is valid.
+    """
+    if not isinstance(events, list) or not events:
+        raise ValueError("'events' must be a non-empty list")
+    if len(events) > MAX_BATCH_EVENTS:
+        raise ValueError(f"At most {MAX_BATCH_EVENTS} events per batch")
+
+    normalised = []
+    for i, event in enumerate(events):
+        if not isinstance(event, dict):
+            raise ValueError(f"Event {i}: expected an object")
+
+        event_id = event.get("id")
+        activity = event.get("activity")
+        dt_text = event.get("datetime")
+
+        if not isinstance(event_id, str) or not event_id.strip():
+            raise ValueError(f"Event {i}: missing 'id'")
+        if not isinstance(activity, str) or not catalog.contains(conn, activity) \
+                or not is_activity_table(conn, catalog, activity):
+            raise ValueError(f"Event {i}: unknown activity {activity!r}")
+        try:
+            dt_value = datetime.strptime(str(dt_text), "%Y-%m-%d %H:%M:%S")
+        except ValueError:
+            raise ValueError(f"Event {i}: 'datetime' must be YYYY-MM-DD HH:MM:SS")
+
+        normalised.append((event_id.strip(), activity, dt_value.strftime("%Y-%m-%d %H:%M:%S")))
+
+    return normalised
+
+
+def insert_events_batch(conn: sqlite3.Connection, events: list) -> tuple:
+    """
+    Write validated (event_id, table, DateTime) events in one transaction.
+
+    Events whose id was already stored (earlier replay of the same
+    offline queue, or repeated inside this batch) are skipped.
+    Returns (inserted_count, duplicate_ids).
+    """
+    # IMMEDIATE takes the write lock up front, so two concurrent replays
+    # of the same queue can't both pass the duplicate check.
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        ids = list({e[0] for e in events})
+        seen = set()
+        for start in range(0, len(ids), 500):
+            chunk = ids[start:start + 500]
+            placeholders = ",".join("?" * len(chunk))
+            seen.update(
+                r[0] for r in conn.execute(
+                    f"SELECT EventId FROM _BatchEventIds WHERE EventId IN ({placeholders})",
+                    chunk,
+                )
+            )
+
+        fresh = []
+        duplicates = []
+        for event in events:
+            if event[0] in seen:
+                duplicates.append(event[0])
+                continue
+            seen.add(event[0])
+            fresh.append(event)
+
+        by_table = {}
+        for _, table, dt_text in fresh:
+            by_table.setdefault(table, []).append(dt_text)
+
+        conn.executemany(
+            "INSERT INTO _BatchEventIds (EventId, TableName, DateTime) VALUES (?, ?, ?)",
+            fresh,
+        )
+        for table, dt_values in by_table.items():
+            conn.executemany(
+                f"INSERT INTO {table} (Activity, DateTime) VALUES (?, ?)",
+                [(table, dt) for dt in dt_values],
+            )
+            record_events(conn, table, dt_values)
+
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+
+    return len(fresh), duplicates
@@ -1,16 +1,35 @@
 import os
+import json
 import sqlite3
-from flask import Flask, render_template, request, jsonify
+from flask import Flask, Response, render_template, request, jsonify, g, stream_with_context
 from datetime import datetime, timedelta
 from google import genai
+from google.genai import types
 import threading
 from typing import Optional
 import platform
 import ctypes
 from ctypes import wintypes
-import markdown
 from pathlib import Path
 import threading
+import time
+from response_cache import ResponseCache, SingleFlight, make_key
+from markdown_render import MarkdownRenderer
+from gemini_jobs import JobQueueFull, JobRunner, backoff_delay
+from dailylog_db import (
+    ConnectionPool,
+    TableCatalog,
+    PAGE_SIZE,
+    activity_stats,
+    ensure_datetime_indexes,
+    ensure_event_ids,
+    ensure_rollups,
+    fetch_page,
+    insert_events_batch,
+    is_activity_table,
+    record_event,
+    validate_events,
+)
 
 
 #Setting OS neutral variables
@@ -87,6 +106,26 @@ def load_ai_keys(file_path: Path) -> dict:
 _gemini_client_lock = threading.Lock()
 _gemini_client: Optional[genai.Client] = None
 
+# Identical prompts (same model) are answered from here instead of the API.
+# The disk tier keeps answers across server restarts.
+GEMINI_CACHE_PATH = PROJECT_ROOT / "gemini_cache.db"
+gemini_cache = ResponseCache(
+    max_entries=256,
+    ttl_seconds=6 * 3600,
+    disk_path=GEMINI_CACHE_PATH,
+)
+
+# Identical prompts that arrive while the first is still running
+# (double tap, two devices) wait for that call instead of making their own.
+gemini_flight = SingleFlight()
+
+# Gemini calls run on their own small pool so slow answers can't tie up
+# the request threads that serve /insert_entry and friends.
+GEMINI_TIMEOUT_MS = 60_000          # per HTTP call to the API
+GEMINI_WAIT_SECONDS = 180           # max wait of the classic form routes
+GEMINI_MAX_CONCURRENCY = 4
+gemini_jobs = JobRunner(max_workers=GEMINI_MAX_CONCURRENCY, max_pending=32)
+
 
 def get_gemini_client() -> genai.Client:
     """
@@ -109,7 +148,10 @@ def get_gemini_client() -> genai.Client:
                     print("Gemini API Key loaded successfully.")
                     # print(gemini_api_key)
 
-                    _gemini_client = genai.Client(api_key=gemini_api_key)
+                    _gemini_client = genai.Client(
+                        api_key=gemini_api_key,
+                        http_options=types.HttpOptions(timeout=GEMINI_TIMEOUT_MS),
+                    )
 
                 except Exception as e:
                     print(f"Error loading API keys: {e}")
@@ -121,13 +163,27 @@ def get_gemini_client() -> genai.Client:
 def gemini_generate(
     prompt: str,
     model: str = "gemini-2.5-flash",
-    max_retries: int = 2
+    max_retries: int = 2,
+    use_cache: bool = True
 ) -> str:
     """
     Central Gemini invocation wrapper.
-    Handles retries + errors.
+    Handles caching, coalescing of identical in-flight prompts,
+    retries + errors.
     """
 
+    if use_cache:
+        cached = gemini_cache.get(model, prompt)
+        if cached is not None:
+            return cached
+
+    return gemini_flight.do(
+        make_key(model, prompt),
+        lambda: _gemini_generate_uncached(prompt, model, max_retries, use_cache),
+    )
+
+
+def _gemini_generate_uncached(prompt: str, model: str, max_retries: int, use_cache: bool) -> str:
     client = get_gemini_client()
 
     last_error = None
@@ -142,20 +198,78 @@ def gemini_generate(
             if not response or not response.text:
                 raise RuntimeError("Empty Gemini response")
 
-            return response.text.strip()
+            answer = response.text.strip()
+            if use_cache:
+                gemini_cache.put(model, prompt, answer)
+            return answer
 
         except Exception as e:
             last_error = e
             print(f"[Gemini retry {attempt+1}] Error:", e)
+            if attempt < max_retries:
+                time.sleep(backoff_delay(attempt))
 
     raise RuntimeError(f"Gemini failed after retries: {last_error}")
 
 
+def gemini_generate_stream(
+    prompt: str,
+    model: str = "gemini-2.5-flash",
+    max_retries: int = 2,
+    use_cache: bool = True
+):
+    """
+    Streaming variant of gemini_generate().
+    Yields text chunks as Gemini produces them. A cache hit is yielded
+    in one piece. Retries only happen before the first chunk went out,
+    the complete answer is cached at the end.
+    """
+
+    if use_cache:
+        cached = gemini_cache.get(model, prompt)
+        if cached is not None:
+            yield cached
+            return
+
+    client = get_gemini_client()
+
+    last_error = None
+
+    for attempt in range(max_retries + 1):
+        parts = []
+        try:
+            for chunk in client.models.generate_content_stream(
+                model=model,
+                contents=prompt
+            ):
+                if chunk.text:
+                    parts.append(chunk.text)
+                    yield chunk.text
+
+            if not parts:
+                raise RuntimeError("Empty Gemini response")
+
+            if use_cache:
+                gemini_cache.put(model, prompt, "".join(parts).strip())
+            return
+
+        except Exception as e:
+            if parts:
+                raise   # already streamed to the client, can't restart
+            last_error = e
+            print(f"[Gemini stream retry {attempt+1}] Error:", e)
+            if attempt < max_retries:
+                time.sleep(backoff_delay(attempt))
+
+    raise RuntimeError(f"Gemini failed after retries: {last_error}")
+
+
+# Prebuilt Markdown instances + LRU of rendered HTML
+markdown_renderer = MarkdownRenderer(pool_size=GEMINI_MAX_CONCURRENCY + 2)
+
+
 def render_markdown(md_text: str) -> str:
-    return markdown.markdown(
-        md_text,
-        extensions=["extra", "codehilite", "tables"]
-    )
+    return markdown_renderer.render(md_text)
 
 
 def turn_off_screen(timeout_ms: int = 2000) -> None:
@@ -195,24 +309,49 @@ def turn_off_screen(timeout_ms: int = 2000) -> None:
 
 
 
+# =========================
+# SQLite Connection Helper
+# =========================
+
+db_pool = ConnectionPool(DB_PATH)
+table_catalog = TableCatalog()
+
+# One-off schema migration at startup, no-op once the indexes exist
+with db_pool.connection() as _conn:
+    for _index in ensure_datetime_indexes(_conn, table_catalog):
+        print(f"Created index {_index}")
+    for _table in ensure_rollups(_conn, table_catalog):
+        print(f"Rebuilt rollups for {_table}")
+    ensure_event_ids(_conn, table_catalog)
+
+
+def get_db() -> sqlite3.Connection:
+    """
+    Pooled connection for the current request.
+    Checked out on first use, returned by close_db() on teardown.
+    """
+    if "db" not in g:
+        g.db = db_pool.acquire()
+    return g.db
+
+
+@app.teardown_appcontext
+def close_db(exc) -> None:
+    conn = g.pop("db", None)
+    if conn is not None:
+        db_pool.release(conn)
+
+
 def get_table_names():
     """
     Return list of table names in activities.db
     (excluding internal sqlite_ tables).
+    Served from the cached table catalog.
     """
-    conn = sqlite3.connect(DB_PATH)
-    cur = conn.cursor()
-    cur.execute("""
-        SELECT name FROM sqlite_master
-        WHERE type='table' AND name NOT LIKE 'sqlite_%'
-        ORDER BY name
-    """)
-    rows = cur.fetchall()
-    conn.close()
-    return [r[0] for r in rows]
+    return table_catalog.names(get_db())
 
 def is_valid_table(name: str) -> bool:
-    return name in get_table_names()
+    return table_catalog.contains(get_db(), name)
 
 
 def getViewTable(activity):
@@ -249,57 +388,101 @@ def activity_action():
     else:
         return "<html><body><p>Unknown action</p></body></html>"
 
-@app.route("/view_results", methods=["POST"])
-def view_results():
-    activity = request.form.get("activity", "")
-    period = request.form.get("listb", "")
-
-    if not is_valid_table(activity):
-        return "<html><body><p>Unknown table.</p></body></html>"
-
-    conn = sqlite3.connect(DB_PATH)
-    cur = conn.cursor()
-
-    # Base query
-    if activity == "Memo":
-        query = f"SELECT SNo, Note, DateTime FROM {activity}"
-    else:
-        query = f"SELECT SerialNumber, Activity, DateTime FROM {activity}"
-    params = []
-    order_clause = " ORDER BY DateTime DESC"
-
+def period_window(period: str):
+    """
+    Map a view period to (since, limit, paginated).
+    Returns None for an unknown period.
+    """
     if period == "last 20 enteries":
-        query += order_clause + " LIMIT 20"
+        return None, 20, False
     elif period == "last one week":
         cutoff = datetime.now() - timedelta(days=7)
-        query += " WHERE DateTime >= ? " + order_clause
-        params.append(cutoff.strftime("%Y-%m-%d %H:%M:%S"))
+        return cutoff.strftime("%Y-%m-%d %H:%M:%S"), PAGE_SIZE, True
     elif period == "last one month":
         cutoff = datetime.now() - timedelta(days=30)
-        query += " WHERE DateTime >= ? " + order_clause
-        params.append(cutoff.strftime("%Y-%m-%d %H:%M:%S"))
+        return cutoff.strftime("%Y-%m-%d %H:%M:%S"), PAGE_SIZE, True
     elif period == "All enteries":
-        query += order_clause
-    else:
-        conn.close()
-        return "<html><body><p>Unknown period.</p></body></html>"
+        return None, PAGE_SIZE, True
+    return None
+
 
-    cur.execute(query, params)
-    rows = cur.fetchall()
-    conn.close()
+def get_entries_page(activity: str, period: str, cursor: Optional[str], limit: Optional[int] = None):
+    """
+    Keyset-paginated rows for view_results and /api/entries.
+    Returns (entries, next_cursor), raises ValueError on bad input.
+    """
+    window = period_window(period)
+    if window is None:
+        raise ValueError("Unknown period.")
+    since, page_size, paginated = window
+    if limit is not None and paginated:
+        page_size = limit
+
+    conn = get_db()
+    key = table_catalog.key_column(conn, activity)
+    value_column = "Note" if activity == "Memo" else "Activity"
+
+    rows, next_cursor = fetch_page(
+        conn, activity, key, value_column,
+        since=since,
+        cursor=cursor if paginated else None,
+        limit=page_size,
+    )
 
     entries = [
         {"serial": r[0], "activity": r[1], "datetime": r[2]}
         for r in rows
     ]
+    return entries, (next_cursor if paginated else None)
+
+
+@app.route("/view_results", methods=["POST"])
+def view_results():
+    activity = request.form.get("activity", "")
+    period = request.form.get("listb", "")
+    cursor = request.form.get("cursor") or None
+
+    if not is_valid_table(activity):
+        return "<html><body><p>Unknown table.</p></body></html>"
+
+    try:
+        entries, next_cursor = get_entries_page(activity, period, cursor)
+    except ValueError as e:
+        return f"<html><body><p>{e}</p></body></html>"
 
     return render_template(
         "view_results.html",
         activity=activity,
         period=period,
         entries=entries,
+        next_cursor=next_cursor,
     )
 
+
+@app.route("/api/entries", methods=["GET"])
+def api_entries():
+    """
+    JSON view API.
+    Query args: activity, period (same values as the view form),
+    cursor (next_cursor of the previous page), limit (max 500).
+    """
+    activity = request.args.get("activity", "")
+    period = request.args.get("period", "All enteries")
+    cursor = request.args.get("cursor") or None
+
+    if not is_valid_table(activity):
+        return jsonify({"error": "Unknown table"}), 404
+
+    try:
+        limit = min(int(request.args.get("limit", PAGE_SIZE)), 500)
+        if limit <= 0:
+            raise ValueError("limit must be positive")
+        entries, next_cursor = get_entries_page(activity, period, cursor, limit)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+    return jsonify({"entries": entries, "next_cursor": next_cursor}), 200
+
 @app.route("/insert_entry", methods=["POST"])
 def insert_entry():
     activity = request.form.get("activity", "")
@@ -313,29 +496,83 @@ def insert_entry():
     else:
         return "<html><body><p>Unknown date selection.</p></body></html>"
 
-    conn = sqlite3.connect(DB_PATH)
-    cur = conn.cursor()
-    cur.execute(
-        f"INSERT INTO {activity} (Activity, DateTime) VALUES (?, ?)",
-        (activity, dt_value.strftime("%Y-%m-%d %H:%M:%S")),
-    )
-    conn.commit()
-    conn.close()
+    dt_text = dt_value.strftime("%Y-%m-%d %H:%M:%S")
+
+    conn = get_db()
+    with conn:
+        conn.execute(
+            f"INSERT INTO {activity} (Activity, DateTime) VALUES (?, ?)",
+            (activity, dt_text),
+        )
+        # Same transaction, so the rollups never drift from the table
+        if is_activity_table(conn, table_catalog, activity):
+            record_event(conn, activity, dt_text)
 
     # Just show "Success" via template
     return render_template("success.html")
 
+@app.route("/api/insert_batch", methods=["POST"])
+def insert_batch():
+    """
+    Replay of offline-queued taps in one request.
+    Body: {"events": [{"id": "<client uuid>", "activity": "Urine",
+                       "datetime": "YYYY-MM-DD HH:MM:SS"}, ...]}
+    Ids already stored are skipped, so resending a queue is harmless.
+    """
+    payload = request.get_json(silent=True) or {}
+    if not isinstance(payload, dict):
+        return jsonify({"error": "Body must be a JSON object with 'events'"}), 400
+
+    conn = get_db()
+    try:
+        events = validate_events(conn, table_catalog, payload.get("events"))
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+    inserted, duplicates = insert_events_batch(conn, events)
+
+    return jsonify({
+        "inserted": inserted,
+        "duplicates": len(duplicates),
+        "duplicate_ids": duplicates,
+    }), 200
+
+STATS_MAX_DAYS = 36500     # ~100 years; larger windows overflow the date math
+
+@app.route("/stats", methods=["GET"])
+def stats():
+    """
+    Frequency / interval stats from the rollup tables.
+    Query args: activity, days (window length, default 30).
+    """
+    activity = request.args.get("activity", "")
+
+    conn = get_db()
+    if not is_valid_table(activity) or not is_activity_table(conn, table_catalog, activity):
+        return jsonify({"error": "Unknown activity table"}), 404
+
+    try:
+        days = int(request.args.get("days", "30"))
+        if not 0 < days <= STATS_MAX_DAYS:
+            raise ValueError
+    except ValueError:
+        return jsonify({"error": f"days must be an integer from 1 to {STATS_MAX_DAYS}"}), 400
+
+    since_day = (datetime.now() - timedelta(days=days - 1)).strftime("%Y-%m-%d")
+    result = activity_stats(conn, activity, since_day)
+    result.update({"activity": activity, "days": days, "since": since_day})
+
+    return jsonify(result), 200
+
 @app.route("/memo", methods=["GET", "POST"])
 def memo():
     if request.method == "POST":
         note = request.form.get("memo", "").strip()
 
         if note:
-            conn = sqlite3.connect(DB_PATH)
-            cur = conn.cursor()
-            cur.execute("INSERT INTO Memo (Note) VALUES (?)", (note,))
-            conn.commit()
-            conn.close()
+            conn = get_db()
+            with conn:
+                conn.execute("INSERT INTO Memo (Note) VALUES (?)", (note,))
 
         # Always show success page after POST (even if empty)
         return render_template("success.html")
@@ -343,67 +580,212 @@ def memo():
     # GET: just show the memo form
     return render_template("memo.html")
 
-@app.route("/game-help", methods=["GET", "POST"])
-def game_help():
-    text = "" 
-    text_choice = ""
-    if request.method == "POST":
-        text = (request.form.get("query_text") or "").strip()
-        text_choice = (request.form.get("game_choice") or "").strip()
+# =========================
+# Gemini Pages
+# =========================
+# Each game_help/gemini_call/hindi2marathi prompt builder turns the
+# submitted form into (prompt, answer prefix). The answer_* functions
+# return (template, answer) and run on the gemini_jobs pool, either
+# awaited inline by the classic form routes or as pollable jobs.
+# /gemini-stream reuses the same builders for token streaming.
+
+def game_help_prompt(form: dict):
+    text = (form.get("query_text") or "").strip()
+    text_choice = (form.get("game_choice") or "").strip()
+
+    print("Received text from /game-help:", text)
+    print("Selected game:", text_choice)
+
+    prompt = (
+        f"How can I achieve the following goal in the standard windows 10 game "
+        f"'{text_choice}'? "
+        f"Please answer in as few words as possible. "
+        f"I am using a Microsoft controller, keyboard and mouse. "
+        f"Give answer for each case if possible. "
+        f"Question: {text}"
+    )
+    return prompt, f"{text_choice} : "
 
-        print("Received text from /game-help:", text)
-        print("Selected game:", text_choice)
-        
-        try:
-            prompt = (
-                f"How can I achieve the following goal in the standard windows 10 game "
-                f"'{text_choice}'? "
-                f"Please answer in as few words as possible. "
-                f"I am using a Microsoft controller, keyboard and mouse. "
-                f"Give answer for each case if possible. "
-                f"Question: {text}"
-            )
 
-            answer_text = gemini_generate(prompt)
+def hindi2marathi_prompt(form: dict):
+    text = (form.get("text") or "").strip()
+    print("Received text from /hindi-transcribe:", text)
 
-        except Exception as e:    
-            print(f"\nError encountered: {e}")
-            return "Gemini API error", 500
-        
-        final_answer = f"{text_choice} : {answer_text}"
-        
-        html_answer = render_markdown(final_answer)
+    prompt = (
+        "Translate Hindi to Marathi. "
+        "Fix grammar if needed. "
+        "Keep answer concise:\n"
+        + text
+    )
+    return prompt, ""
 
-        return render_template("ganswer.html", answer=html_answer)
 
-    # GET: serve the HTML page
-    return render_template("game_help.html")
+def gemini_call_prompt(form: dict):
+    text = (form.get("query_text") or "").strip()
+    print("Received text from /gemini-call:", text)
 
+    prompt = (
+        "Answer briefly but keep key details:\n"
+        + text
+    )
+    return prompt, ""
 
-@app.route("/hindi2marathi-transcribe", methods=["GET", "POST"])
-def hindi2marathi_transcribe():
-    if request.method == "GET":
-        return render_template("transcribe.html")
 
-    # POST handling:
-    text = (request.form.get("text") or "").strip()
-    print("Received text from /hindi-transcribe:", text)
+def answer_game_help(form: dict):
+    prompt, prefix = game_help_prompt(form)
+    return "ganswer.html", render_markdown(prefix + gemini_generate(prompt))
+
+
+def answer_hindi2marathi(form: dict):
+    prompt, _ = hindi2marathi_prompt(form)
+    return "ganswerhindi2marathi.html", gemini_generate(prompt)
+
+
+def answer_gemini_call(form: dict):
+    prompt, _ = gemini_call_prompt(form)
+    return "geminianswer.html", render_markdown(gemini_generate(prompt))
+
+
+GEMINI_PAGES = {
+    "game-help": answer_game_help,
+    "hindi2marathi-transcribe": answer_hindi2marathi,
+    "gemini-call": answer_gemini_call,
+}
+
 
+def run_gemini_page(kind: str):
+    """
+    Classic form POST: wait for the answer on the pool, render the template.
+    """
     try:
-        prompt = (
-            "Translate Hindi to Marathi. "
-            "Fix grammar if needed. "
-            "Keep answer concise:\n"
-            + text
+        template, answer = gemini_jobs.run(
+            kind, GEMINI_PAGES[kind], request.form.to_dict(),
+            timeout=GEMINI_WAIT_SECONDS,
         )
+    except JobQueueFull:
+        return "Gemini is busy, try again shortly", 429, {"Retry-After": "5"}
+    except Exception as e:
+        print(f"\nError encountered: {e}")
+        return "Gemini API error", 500
+
+    return render_template(template, answer=answer)
+
+
+GEMINI_STREAM_PROMPTS = {
+    "game-help": game_help_prompt,
+    "gemini-call": gemini_call_prompt,
+}
+
+# Streams hold their request open for the whole answer, cap them like the pool
+gemini_stream_slots = threading.BoundedSemaphore(GEMINI_MAX_CONCURRENCY)
+
+
+def sse_event(payload: dict, event: Optional[str] = None) -> str:
+    head = f"event: {event}\n" if event else ""
+    return f"{head}data: {json.dumps(payload)}\n\n"
 
-        answer_text = gemini_generate(prompt)
 
+@app.route("/gemini-stream/<kind>", methods=["POST"])
+def gemini_stream(kind):
+    """
+    Server-Sent Events answer for /game-help and /gemini-call.
+    Same form fields as the classic routes. Every chunk sends just the
+    new text ({"text": ...}), which the page shows as plain text; the
+    final "done" event carries the whole answer rendered ({"html": ...}).
+    Re-rendering the full answer per chunk would be quadratic in its length.
+    """
+    if kind not in GEMINI_STREAM_PROMPTS:
+        return jsonify({"error": f"Unknown kind {kind}"}), 404
+
+    if not gemini_stream_slots.acquire(blocking=False):
+        return jsonify({"error": "Gemini is busy"}), 429, {"Retry-After": "5"}
+
+    prompt, prefix = GEMINI_STREAM_PROMPTS[kind](request.form.to_dict())
+
+    def events():
+        parts = [prefix]
+        try:
+            if prefix:
+                yield sse_event({"text": prefix})
+            for chunk in gemini_generate_stream(prompt):
+                parts.append(chunk)
+                yield sse_event({"text": chunk})
+            yield sse_event({"html": render_markdown("".join(parts))}, event="done")
+        except Exception as e:
+            print(f"\nError encountered: {e}")
+            yield sse_event({"error": "Gemini API error"}, event="error")
+
+    response = Response(
+        stream_with_context(events()),
+        mimetype="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+    # Runs even if the client goes away before the first chunk
+    response.call_on_close(gemini_stream_slots.release)
+    return response
+
+
+@app.route("/gemini-jobs/<kind>", methods=["POST"])
+def submit_gemini_job(kind):
+    """
+    Async variant of the Gemini form routes.
+    Same form fields as /<kind>, answers 202 with a job id to poll.
+    """
+    if kind not in GEMINI_PAGES:
+        return jsonify({"error": f"Unknown kind {kind}"}), 404
+
+    try:
+        job = gemini_jobs.submit(kind, GEMINI_PAGES[kind], request.form.to_dict())
+    except JobQueueFull as e:
+        return jsonify({"error": str(e)}), 429, {"Retry-After": "5"}
+
+    return jsonify({
+        "job_id": job.id,
+        "status_url": f"/gemini-jobs/status/{job.id}",
+        "view_url": f"/gemini-jobs/view/{job.id}",
+    }), 202
+
+
+@app.route("/gemini-jobs/status/<job_id>", methods=["GET"])
+def gemini_job_status(job_id):
+    job = gemini_jobs.get(job_id)
+    if job is None:
+        return jsonify({"error": "Unknown or expired job"}), 404
+    return jsonify(job.status()), 200
+
+
+@app.route("/gemini-jobs/view/<job_id>", methods=["GET"])
+def gemini_job_view(job_id):
+    job = gemini_jobs.get(job_id)
+    if job is None:
+        return "Unknown or expired job", 404
+    if not job.future.done():
+        return "Still working, try again shortly", 202, {"Retry-After": "1"}
+
+    try:
+        template, answer = job.future.result()
     except Exception as e:
         print(f"\nError encountered: {e}")
         return "Gemini API error", 500
 
-    return render_template("ganswerhindi2marathi.html", answer=answer_text)
+    return render_template(template, answer=answer)
+
+
+@app.route("/game-help", methods=["GET", "POST"])
+def game_help():
+    if request.method == "POST":
+        return run_gemini_page("game-help")
+
+    # GET: serve the HTML page
+    return render_template("game_help.html")
+
+
+@app.route("/hindi2marathi-transcribe", methods=["GET", "POST"])
+def hindi2marathi_transcribe():
+    if request.method == "GET":
+        return render_template("transcribe.html")
+
+    return run_gemini_page("hindi2marathi-transcribe")
 
 
 @app.route("/screen-off", methods=["POST", "GET"])
@@ -418,31 +800,18 @@ def screen_off_handler():
     except Exception as exc:
         return jsonify({"status": "error", "message": str(exc)}), 500
 
+@app.route("/gemini-cache-stats", methods=["GET"])
+def gemini_cache_stats():
+    result = gemini_cache.stats()
+    result["single_flight"] = gemini_flight.stats()
+    result["markdown"] = markdown_renderer.stats()
+    return jsonify(result), 200
+
 @app.route("/gemini-call", methods=["GET", "POST"])
 def gemini_help():
-    text = "" 
-
     if request.method == "POST":
-        text = (request.form.get("query_text") or "").strip()
-
-        print("Received text from /gemini-call:", text)
-        
-        try:
-            prompt = (
-                "Answer briefly but keep key details:\n"
-                + text
-            )
-
-            answer_text = gemini_generate(prompt)
-
-        except Exception as e:    
-            print(f"\nError encountered: {e}")
-        
-        #return render_template("ganswer.html", answer=response.text)
-        
-        html_answer = render_markdown(answer_text)
+        return run_gemini_page("gemini-call")
 
-        return render_template("geminianswer.html", answer=html_answer)
     # GET: serve the HTML page
     return render_template("gemini_help.html")
 
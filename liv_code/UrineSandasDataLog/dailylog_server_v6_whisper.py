@@ -3,13 +3,11 @@ import sqlite3
 from flask import Flask, render_template, request, jsonify
 from datetime import datetime, timedelta
 
-from faster_whisper import WhisperModel
 import tempfile
 
 import google.generativeai as genai
 
 import numpy as np
-import threading
 
 from typing import Optional
 from google.generativeai.types import GenerateContentResponse
@@ -20,22 +18,73 @@ from ctypes import wintypes
 
 import markdown
 
+from audio_decode import (
+    UnsupportedAudio,
+    audio_format,
+    decode_upload,
+    parse_content_type,
+    pcm_to_float32,
+)
+from resample import Resampler, resample
+from hindi_whisper import (
+    SAMPLE_RATE,
+    hindi_segmenter,
+    hindi_transcript_key,
+    open_transcript_cache,
+    transcribe_hindi,
+)
+from response_cache import SingleFlight
+from whisper_service import (
+    PoolBusy,
+    StreamRegistry,
+    TranscriptionStream,
+    WhisperLoader,
+    WhisperPool,
+    default_worker_split,
+)
+
 # -------------------------
 # CONFIG
 # -------------------------
 MODEL_SIZE = "medium"   # you asked for large
 DEVICE = "cpu"            # change to "cuda" if you have a supported GPU
 COMPUTE_TYPE = "int8" if DEVICE == "cpu" else "float16"
-SAMPLE_RATE = 16000       # expected sample-rate from client
-
-print(f"Loading Whisper model ({MODEL_SIZE}) on {DEVICE} with compute_type={COMPUTE_TYPE}...")
-model = WhisperModel(MODEL_SIZE, device=DEVICE, compute_type=COMPUTE_TYPE)
-print("Model loaded.")
+# SAMPLE_RATE (16 kHz) comes from hindi_whisper, other client rates are resampled
+MIN_INPUT_RATE = 8000
+MAX_INPUT_RATE = 96000
+
+# Parallel transcriptions: None = one worker per 4 cores.
+# Cores are split evenly between workers (cpu_threads).
+WHISPER_WORKERS, WHISPER_CPU_THREADS = default_worker_split(
+    int(os.environ["WHISPER_WORKERS"]) if os.environ.get("WHISPER_WORKERS") else None
+)
+WHISPER_MAX_QUEUE = 8     # waiting requests beyond this get HTTP 429
+
+# Loaded + warmed up in the background, the SQLite routes serve meanwhile.
+# /transcribe answers 503 until it's ready, /ready reports progress.
+whisper_loader = WhisperLoader(
+    MODEL_SIZE, DEVICE, COMPUTE_TYPE,
+    sample_rate=SAMPLE_RATE,
+    num_workers=WHISPER_WORKERS,
+    cpu_threads=WHISPER_CPU_THREADS,
+).start()
+whisper_pool = WhisperPool(whisper_loader, WHISPER_WORKERS, max_queue=WHISPER_MAX_QUEUE)
+
+# Live dictation sessions (/transcribe-stream), dropped after 5 idle minutes
+whisper_streams = StreamRegistry(idle_seconds=300, max_streams=16)
+STREAM_FINISH_TIMEOUT = 120
 
 # Path to your SQLite database (activities.db)
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
 DB_PATH = os.path.join(BASE_DIR, "activities.db")
 
+# Finished transcripts by audio hash + settings: client retries and re-sent
+# clips return instantly. /transcribe-stream caches per utterance with the
+# same keys as hindi_dictation_gui.py (see hindi_whisper), /transcribe
+# caches whole uploaded clips, which only its own re-sends hit.
+transcript_cache = open_transcript_cache(max_entries=512)
+transcript_flight = SingleFlight()
+
 # Path to your web folder with HTML
 TEMPLATE_FOLDER = r"C:\Users\dheer\OneDrive\DheerajOnHP\liv_code\UrineSandasDataLog\web"
 
@@ -43,9 +92,6 @@ app = Flask(__name__, template_folder=TEMPLATE_FOLDER)
 
 LRESULT = ctypes.c_ssize_t 
 
-# To avoid concurrent access issues on a single model instance
-model_lock = threading.Lock()
-
 
 def turn_off_screen(timeout_ms: int = 2000) -> None:
     if platform.system() != "Windows":
@@ -314,15 +360,60 @@ def hindi_transcribe():
 
         return render_template("ganswerhindi2marathi.html", answer=response.text)
 
+NO_TEXT = "[No text recognized]"
+
+
+def transcribe_utterance(model, audio: np.ndarray) -> str:
+    """
+    Run on a whisper_pool worker with that worker's model (/transcribe-stream).
+    """
+    key = hindi_transcript_key(audio, MODEL_SIZE, COMPUTE_TYPE)
+    text = transcript_cache.get(key)
+    if text is None:
+        text = transcribe_hindi(model, audio)
+        transcript_cache.put(key, text)
+    return text or NO_TEXT
+
+
+def whisper_not_ready():
+    """
+    Error response while the model can't be used, else None.
+    503 + Retry-After while it loads; 500 with the error once loading failed
+    (retrying won't help until the server is restarted).
+    """
+    if whisper_loader.ready:
+        return None
+
+    status = whisper_loader.status()
+    if status["status"] == "failed":
+        return jsonify({
+            **status,
+            "error": f"Whisper model failed to load: {status['error']}",
+        }), 500
+
+    return jsonify({
+        "error": "Whisper model is still loading",
+        **status,
+    }), 503, {"Retry-After": "5"}
+
+
 @app.route("/transcribe", methods=["POST"])
 def transcribe():
     """
-    Expects:
-      - raw float32 mono PCM samples in the request body
-      - header: X-Sample-Rate = 16000
+    Expects, chosen by Content-Type:
+      - application/octet-stream (default): raw float32 mono PCM
+      - audio/L16 (or audio/x-int16): raw int16 little-endian mono PCM
+      - audio/webm, audio/ogg: Opus recording from MediaRecorder
+      - header: X-Sample-Rate for raw PCM (or ';rate=' in Content-Type),
+        anything 8-96 kHz is resampled to 16 kHz on the server
     Returns:
-      JSON: { "text": "<Hindi text>" }
+      JSON: { "text": "<Hindi text>", "cached": bool, "queue_ms": ..., "inference_ms": ... }
+      429 + Retry-After when the transcription queue is full
     """
+    not_ready = whisper_not_ready()
+    if not_ready:
+        return not_ready
+
     if not request.data:
         return jsonify({"error": "No audio data received"}), 400
 
@@ -331,38 +422,155 @@ def transcribe():
     except ValueError:
         return jsonify({"error": "Invalid X-Sample-Rate header"}), 400
 
-    if sample_rate != SAMPLE_RATE:
-        # For simplicity, enforce 16 kHz; we can add resampling if needed later.
+    try:
+        audio, sample_rate = decode_upload(
+            request.data, request.content_type, sample_rate, SAMPLE_RATE
+        )
+    except UnsupportedAudio as e:
+        return jsonify({"error": str(e)}), 415
+    except Exception as e:
+        return jsonify({"error": f"Could not decode audio: {e}"}), 400
+
+    if not MIN_INPUT_RATE <= sample_rate <= MAX_INPUT_RATE:
         return jsonify({
-            "error": f"Expected sample rate {SAMPLE_RATE}, got {sample_rate}"
+            "error": f"Sample rate {sample_rate} outside {MIN_INPUT_RATE}-{MAX_INPUT_RATE}"
         }), 400
 
-    pcm_bytes = request.data
-    # Reconstruct float32 mono audio
-    audio = np.frombuffer(pcm_bytes, dtype=np.float32)
+    # Phones record at 44.1/48 kHz, Whisper wants 16 kHz
+    audio = resample(audio, sample_rate, SAMPLE_RATE)
 
     if audio.size == 0:
         return jsonify({"error": "Empty audio data"}), 400
 
-    with model_lock:
-        segments, info = model.transcribe(
-            audio,
-            language="hi",         # Force Hindi
-            task="transcribe",     # Not "translate"
-            beam_size=5,
-            initial_prompt=("""
-        हिंदी भाषा, हिंदी शब्द, भारत, मराठी, मराठी भाषा।
-        कृपया "है" और "हैं" में अंतर स्पष्ट रूप से रखें।
-        एकवचन के लिए "है" और बहुवचन के लिए "हैं" का प्रयोग करें।
-        """)
-        )
+    key = hindi_transcript_key(audio, MODEL_SIZE, COMPUTE_TYPE)
+    text = transcript_cache.get(key)
+    if text is not None:
+        return jsonify({"text": text or NO_TEXT, "cached": True, "queue_ms": 0.0, "inference_ms": 0.0}), 200
+
+    def run():
+        done = whisper_pool.submit(lambda model: transcribe_hindi(model, audio)).result()
+        transcript_cache.put(key, done["result"])
+        return done
+
+    try:
+        # A retry arriving while the first attempt is still decoding waits for it
+        done = transcript_flight.do(key, run)
+    except PoolBusy as e:
+        return jsonify({"error": str(e)}), 429, {"Retry-After": str(e.retry_after)}
+
+    return jsonify({
+        "text": done["result"] or NO_TEXT,
+        "cached": False,
+        "queue_ms": done["queue_ms"],
+        "inference_ms": done["inference_ms"],
+    }), 200
+
+
+@app.route("/ready", methods=["GET"])
+def ready():
+    """
+    Health/readiness of the speech model.
+    200 once the model is loaded and warmed up, 503 while loading or failed.
+    """
+    status = whisper_loader.status()
+    status["pool"] = whisper_pool.stats()
+    status["transcript_cache"] = transcript_cache.stats()
+    return jsonify(status), (200 if status["status"] == "ready" else 503)
+
+
+# =========================
+# Streaming transcription
+# =========================
+# Chunked-POST protocol (no WebSocket in this Flask setup):
+#   POST /transcribe-stream/start              X-Sample-Rate (default 16000) -> {"session_id"}
+#   POST /transcribe-stream/<id>/chunk         body: float32 or audio/L16 mono PCM at that rate,
+#                                              Content-Type required (415 otherwise)
+#   GET  /transcribe-stream/<id>               poll for new text
+#   POST /transcribe-stream/<id>/finish        flush + wait, returns the rest
+# Each chunk/poll answers with the utterances decoded since the last call:
+#   {"texts": [...], "pending_utterances": n, "in_speech": bool, "done": bool}
+
+def get_stream(session_id: str):
+    stream = whisper_streams.get(session_id)
+    if stream is None:
+        return None, (jsonify({"error": "Unknown or expired session"}), 404)
+    return stream, None
+
+
+@app.route("/transcribe-stream/start", methods=["POST"])
+def transcribe_stream_start():
+    not_ready = whisper_not_ready()
+    if not_ready:
+        return not_ready
+
+    try:
+        sample_rate = int(request.headers.get("X-Sample-Rate", str(SAMPLE_RATE)))
+    except ValueError:
+        return jsonify({"error": "Invalid X-Sample-Rate header"}), 400
+    if not MIN_INPUT_RATE <= sample_rate <= MAX_INPUT_RATE:
+        return jsonify({
+            "error": f"Sample rate {sample_rate} outside {MIN_INPUT_RATE}-{MAX_INPUT_RATE}"
+        }), 400
+
+    stream = TranscriptionStream(
+        whisper_pool,
+        hindi_segmenter(),
+        transcribe_utterance,
+        resampler=Resampler(sample_rate, SAMPLE_RATE) if sample_rate != SAMPLE_RATE else None,
+    )
+    if not whisper_streams.add(stream):
+        return jsonify({"error": "Too many live sessions"}), 429, {"Retry-After": "30"}
+
+    return jsonify({"session_id": stream.id, "sample_rate": sample_rate}), 200
+
+
+@app.route("/transcribe-stream/<session_id>/chunk", methods=["POST"])
+def transcribe_stream_chunk(session_id):
+    stream, error = get_stream(session_id)
+    if error:
+        return error
+    if stream.finished:
+        return jsonify({"error": "Session already finished"}), 409
+
+    # Chunks are raw PCM at the session's rate; say which kind explicitly,
+    # anything else would be decoded as float32 noise
+    if not request.content_type:
+        return jsonify({"error": "Content-Type required (float32 or audio/L16 PCM)"}), 415
+    try:
+        fmt = audio_format(parse_content_type(request.content_type)[0])
+    except UnsupportedAudio as e:
+        return jsonify({"error": str(e)}), 415
+    if fmt not in ("float32", "int16"):
+        return jsonify({"error": "Stream chunks must be raw PCM, not a container"}), 415
+
+    try:
+        samples = pcm_to_float32(request.data, fmt)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+    stream.feed(samples)
+    return jsonify(stream.poll()), 200
+
+
+@app.route("/transcribe-stream/<session_id>", methods=["GET"])
+def transcribe_stream_poll(session_id):
+    stream, error = get_stream(session_id)
+    if error:
+        return error
+    return jsonify(stream.poll()), 200
 
 
-        text = "".join(seg.text for seg in segments).strip()
-        if not text:
-            text = "[No text recognized]"
+@app.route("/transcribe-stream/<session_id>/finish", methods=["POST"])
+def transcribe_stream_finish(session_id):
+    stream, error = get_stream(session_id)
+    if error:
+        return error
 
-    return jsonify({"text": text}), 200
+    stream.finish()
+    state = stream.wait(timeout=STREAM_FINISH_TIMEOUT)
+    if state["done"]:
+        whisper_streams.remove(session_id)
+    return jsonify(state), (200 if state["done"] else 202)
 
 
 @app.route("/screen-off", methods=["POST", "GET"])
@@ -0,0 +1,97 @@
+import random
+import threading
+import time
+import uuid
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Optional
+
+
+def backoff_delay(attempt: int, base: float = 0.5, cap: float = 8.0) -> float:
+    """
+    Exponential backoff with full jitter:
+    uniform(0, min(cap, base * 2**attempt)) seconds.
+    """
+    return random.uniform(0, min(cap, base * (2 ** attempt)))
+
+
+class JobQueueFull(RuntimeError):
+    pass
+
+
+class Job:
+    def __init__(self, kind: str, future: Future):
+        self.id = uuid.uuid4().hex
+        self.kind = kind
+        self.future = future
+        self.created_at = time.time()
+
+    def status(self) -> dict:
+        if not self.future.done():
+            return {
+                "job_id": self.id,
+                "status": "pending",
+                "elapsed": round(time.time() - self.created_at, 1),
+            }
+
+        error = self.future.exception()
+        if error is not None:
+            return {"job_id": self.id, "status": "error", "error": str(error)}
+
+        return {"job_id": self.id, "status": "done"}
+
+
+# =========================
+# Background Job Runner
+# =========================
+
+class JobRunner:
+    """
+    Runs slow LLM calls on a small bounded thread pool.
+
+    max_workers caps how many calls hit the API at once,
+    max_pending caps queued + running jobs (submit raises JobQueueFull),
+    finished jobs are kept keep_seconds for the page to poll, then dropped.
+    """
+
+    def __init__(self, max_workers: int = 4, max_pending: int = 32, keep_seconds: float = 600):
+        self.max_pending = max_pending
+        self.keep_seconds = keep_seconds
+
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_workers,
+            thread_name_prefix="gemini",
+        )
+        self._jobs = {}
+        self._lock = threading.Lock()
+
+    def _purge(self) -> None:
+        # Caller holds self._lock
+        cutoff = time.time() - self.keep_seconds
+        for job_id in [j.id for j in self._jobs.values()
+                       if j.future.done() and j.created_at < cutoff]:
+            del self._jobs[job_id]
+
+    def pending(self) -> int:
+        with self._lock:
+            return sum(1 for j in self._jobs.values() if not j.future.done())
+
+    def submit(self, kind: str, fn, *args, **kwargs) -> Job:
+        with self._lock:
+            self._purge()
+            if sum(1 for j in self._jobs.values() if not j.future.done()) >= self.max_pending:
+                raise JobQueueFull(f"{self.max_pending} Gemini jobs already queued")
+
+            job = Job(kind, self._executor.submit(fn, *args, **kwargs))
+            self._jobs[job.id] = job
+        return job
+
+    def get(self, job_id: str) -> Optional[Job]:
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def run(self, kind: str, fn, *args, timeout: Optional[float] = None, **kwargs):
+        """
+        Submit and wait, for callers that still need the answer inline.
+        The concurrency cap still applies.
+        """
+        return self.submit(kind, fn, *args, **kwargs).future.result(timeout=timeout)
@@ -6,20 +6,77 @@ import tkinter as tk
 from tkinter.scrolledtext import ScrolledText
 from faster_whisper import WhisperModel
 
+from hindi_whisper import (
+    SAMPLE_RATE,
+    hindi_segmenter,
+    hindi_transcript_key,
+    open_transcript_cache,
+    transcribe_hindi,
+)
+
 # -------------------------
 # CONFIG
 # -------------------------
-SAMPLE_RATE = 16000  # Whisper expects 16kHz
+# SAMPLE_RATE (16 kHz) and the Hindi decode settings come from hindi_whisper
 CHANNELS = 1         # mono
 MODEL_SIZE = "medium"  # or "medium" if your machine can handle it
+COMPUTE_TYPE = "int8"  # same model/compute type as the CPU server, so cache entries match
+RING_SECONDS = 120   # capture buffer, transcription may lag this far behind
+
+# -------------------------
+# CAPTURE RING BUFFER
+# -------------------------
+class AudioRing:
+    """
+    Preallocated mono float32 buffer the audio callback writes into
+    (no per-callback allocation). Positions are absolute sample counts,
+    readers ask for any range within the last `capacity` samples.
+    """
+
+    def __init__(self, capacity):
+        self.capacity = capacity
+        self.data = np.zeros(capacity, dtype=np.float32)
+        self.written = 0
+        self._cond = threading.Condition()
+
+    def write(self, samples):
+        samples = samples[-self.capacity:]
+        n = samples.size
+        with self._cond:
+            start = self.written % self.capacity
+            first = min(n, self.capacity - start)
+            self.data[start:start + first] = samples[:first]
+            self.data[:n - first] = samples[first:]
+            self.written += n
+            self._cond.notify_all()
+
+    def wait_for(self, position, timeout):
+        with self._cond:
+            self._cond.wait_for(lambda: self.written >= position, timeout)
+            return self.written
+
+    def read(self, start, end):
+        with self._cond:
+            i, j = start % self.capacity, end % self.capacity
+            if i < j or start == end:
+                return self.data[i:j].copy()
+            return np.concatenate([self.data[i:], self.data[:j]])
+
 
 # -------------------------
 # GLOBAL STATE
 # -------------------------
-audio_queue = queue.Queue()
+ring = AudioRing(RING_SECONDS * SAMPLE_RATE)
 recording = False
 stream = None
+session = None
 model = None
+model_lock = threading.Lock()
+
+# Same cache file and per-utterance keys as the server's /transcribe-stream,
+# so an utterance already transcribed by either one comes back without
+# running Whisper again
+transcript_cache = open_transcript_cache(max_entries=128)
 
 # -------------------------
 # AUDIO CALLBACK
@@ -28,71 +85,106 @@ def audio_callback(indata, frames, time, status):
     if status:
         print("Audio status:", status)
     if recording:
-        # Flatten to mono, copy to queue
-        audio_queue.put(indata.copy())
+        # Mono column straight into the ring buffer
+        ring.write(indata[:, 0])
 
 # -------------------------
 # TRANSCRIPTION LOGIC
 # -------------------------
-def transcribe_audio(app):
+def transcribe_utterance(app, audio_data):
     """
-    Pull all audio from the queue, run Whisper (Hindi only),
-    and display the text in the GUI.
+    Run Whisper (Hindi only) on one utterance, loading the model on first use.
     """
-    # Gather all audio frames from queue
-    frames = []
-    while not audio_queue.empty():
-        frames.append(audio_queue.get())
-
-    if not frames:
-        app.append_text("\n[No audio captured]\n")
-        return
+    global model
 
-    audio_data = np.concatenate(frames, axis=0)
+    key = hindi_transcript_key(audio_data, MODEL_SIZE, COMPUTE_TYPE)
+    text = transcript_cache.get(key)
+    if text is not None:
+        return text
 
-    # Convert to mono if necessary
-    if audio_data.ndim > 1:
-        audio_data = np.mean(audio_data, axis=1)
+    with model_lock:
+        if model is None:
+            # Lazy-load model (so the app window appears quickly)
+            app.root.after(0, lambda: app.append_text("[Loading Whisper model... this may take a while]\n"))
+            # For CPU: device="cpu", compute_type="int8"
+            # For GPU: device="cuda", compute_type="float16"
+            model = WhisperModel(MODEL_SIZE, device="cpu", compute_type=COMPUTE_TYPE)
 
-    # WhisperModel expects float32
-    audio_data = audio_data.astype(np.float32)
+    # Force Hindi, Devanagari output
+    text = transcribe_hindi(model, audio_data)
+    transcript_cache.put(key, text)
+    return text
 
-    app.append_text("\n[Transcribing...]\n")
 
-    def worker():
-        global model
-        try:
-            if model is None:
-                # Lazy-load model (so the app window appears quickly)
-                app.append_text("[Loading Whisper model... this may take a while]\n")
-                # For CPU: device="cpu", compute_type="int8"
-                # For GPU: device="cuda", compute_type="float16"
-                model = WhisperModel(MODEL_SIZE, device="cpu", compute_type="int8")
-
-            # Force Hindi, Devanagari output
-            segments, info = model.transcribe(
-                audio_data,
-                language="hi",       # force Hindi
-                task="transcribe",   # not "translate"
-                beam_size=5
-            )
-
-            text = "".join(segment.text for segment in segments).strip()
-            if not text:
-                text = "[No text recognized]"
-
-            def update_ui():
-                app.append_text("\n--- Transcription (Hindi) ---\n")
-                app.append_text(text + "\n")
-
-            app.root.after(0, update_ui)
+class DictationSession:
+    """
+    One Start..Stop recording, transcribed while it is still going.
 
-        except Exception as e:
-            def update_ui_err():
-                app.append_text(f"\n[Error during transcription: {e}]\n")
-            app.root.after(0, update_ui_err)
+    Segmenter thread: new audio from the ring -> VAD -> closed utterances.
+    Transcriber thread: utterances -> Whisper -> text appended to the GUI.
+    After Stop the segmenter flushes the last utterance and the transcriber
+    finishes the queue, so only the tail is left to wait for.
+    """
 
-    threading.Thread(target=worker, daemon=True).start()
+    def __init__(self, app):
+        self.app = app
+        self.start_pos = ring.written
+        self.stopped = threading.Event()
+        self.utterances = queue.Queue()
+
+        threading.Thread(target=self._segment, daemon=True).start()
+        threading.Thread(target=self._transcribe, daemon=True).start()
+
+    def stop(self):
+        # Call after the stream has stopped, so ring.written is final
+        self.stopped.set()
+
+    def _ui(self, content):
+        self.app.root.after(0, lambda: self.app.append_text(content))
+
+    def _segment(self):
+        segmenter = hindi_segmenter()
+        step = SAMPLE_RATE // 10
+        pos = self.start_pos
+
+        while True:
+            stopping = self.stopped.is_set()
+            written = ring.written if stopping else ring.wait_for(pos + step, timeout=0.2)
+
+            if written - pos > ring.capacity:
+                self._ui(f"\n[Fell {(written - pos) / SAMPLE_RATE:.0f}s behind, some audio skipped]\n")
+                pos = written - ring.capacity
+
+            if written > pos:
+                for utterance in segmenter.feed(ring.read(pos, written)):
+                    self.utterances.put(utterance)
+                pos = written
+
+            if stopping:
+                tail = segmenter.flush()
+                if tail is not None:
+                    self.utterances.put(tail)
+                self.utterances.put(None)
+                return
+
+    def _transcribe(self):
+        spoken = False
+        while True:
+            audio_data = self.utterances.get()
+            if audio_data is None:
+                break
+
+            try:
+                text = transcribe_utterance(self.app, audio_data)
+            except Exception as e:
+                self._ui(f"\n[Error during transcription: {e}]\n")
+                continue
+
+            if text:
+                spoken = True
+                self._ui(text + " ")
+
+        self._ui("\n[Done]\n" if spoken else "\n[No speech recognized]\n")
 
 # -------------------------
 # APP GUI CLASS
@@ -110,11 +202,11 @@ class HindiDictationApp:
         self.start_btn = tk.Button(btn_frame, text="Start Listening", command=self.start_listening, width=15)
         self.start_btn.pack(side=tk.LEFT, padx=5)
 
-        self.stop_btn = tk.Button(btn_frame, text="Stop + Transcribe", command=self.stop_listening, width=15, state=tk.DISABLED)
+        self.stop_btn = tk.Button(btn_frame, text="Stop", command=self.stop_listening, width=15, state=tk.DISABLED)
         self.stop_btn.pack(side=tk.LEFT, padx=5)
 
         # Info label
-        self.label = tk.Label(root, text="Press 'Start Listening' and speak in Hindi. Then press 'Stop + Transcribe'.")
+        self.label = tk.Label(root, text="Press 'Start Listening' and speak in Hindi. Text appears after each pause.")
         self.label.pack(pady=5)
 
         # Text area
@@ -129,14 +221,10 @@ class HindiDictationApp:
         self.text_area.see(tk.END)
 
     def start_listening(self):
-        global recording, stream
+        global recording, stream, session
         if recording:
             return
 
-        # Clear any old audio from queue
-        while not audio_queue.empty():
-            audio_queue.get()
-
         try:
             stream = sd.InputStream(
                 samplerate=SAMPLE_RATE,
@@ -145,6 +233,8 @@ class HindiDictationApp:
                 callback=audio_callback
             )
             stream.start()
+            # Starts reading the ring at its current end, older audio is ignored
+            session = DictationSession(self)
             recording = True
             self.append_text("\n[Listening... speak in Hindi]\n")
             self.start_btn.config(state=tk.DISABLED)
@@ -154,7 +244,7 @@ class HindiDictationApp:
             self.append_text("Check Windows microphone permissions.\n")
 
     def stop_listening(self):
-        global recording, stream
+        global recording, stream, session
         if not recording:
             return
 
@@ -171,8 +261,9 @@ class HindiDictationApp:
         self.start_btn.config(state=tk.NORMAL)
         self.stop_btn.config(state=tk.DISABLED)
 
-        # Now transcribe whatever we captured
-        transcribe_audio(self)
+        # Finish the last utterance, earlier ones are already transcribed
+        session.stop()
+        session = None
 
 
 # -------------------------
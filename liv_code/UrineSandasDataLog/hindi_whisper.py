@@ -0,0 +1,59 @@
+import os
+
+import numpy as np
+
+from transcript_cache import TranscriptCache, transcript_key
+from vad import UtteranceSegmenter
+
+
+# =========================
+# Shared Hindi Whisper setup
+# =========================
+# Used by dailylog_server_v6_whisper.py (/transcribe-stream) and
+# hindi_dictation_gui.py. Both cut audio into utterances with
+# hindi_segmenter() and cache each utterance under hindi_transcript_key(),
+# so the same recording gives the same keys in either process and the
+# transcript_cache.db file is shared between them. Changing anything here
+# changes the keys, old entries are then simply never hit again.
+
+SAMPLE_RATE = 16000     # Whisper's input rate
+
+HINDI_INITIAL_PROMPT = ("""
+        हिंदी भाषा, हिंदी शब्द, भारत, मराठी, मराठी भाषा।
+        कृपया "है" और "हैं" में अंतर स्पष्ट रूप से रखें।
+        एकवचन के लिए "है" और बहुवचन के लिए "हैं" का प्रयोग करें।
+        """)
+
+HINDI_TRANSCRIBE_SETTINGS = {
+    "language": "hi",           # Force Hindi
+    "task": "transcribe",       # Not "translate"
+    "beam_size": 5,
+    "initial_prompt": HINDI_INITIAL_PROMPT,
+}
+
+TRANSCRIPT_CACHE_PATH = os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), "transcript_cache.db"
+)
+
+
+def open_transcript_cache(max_entries: int) -> TranscriptCache:
+    return TranscriptCache(max_entries=max_entries, disk_path=TRANSCRIPT_CACHE_PATH)
+
+
+def hindi_segmenter() -> UtteranceSegmenter:
+    """
+    Utterance boundaries are the cache unit, so both sides cut the same way.
+    """
+    return UtteranceSegmenter(sample_rate=SAMPLE_RATE)
+
+
+def hindi_transcript_key(audio: np.ndarray, model_size: str, compute_type: str) -> str:
+    return transcript_key(audio, f"{model_size}/{compute_type}", **HINDI_TRANSCRIBE_SETTINGS)
+
+
+def transcribe_hindi(model, audio: np.ndarray) -> str:
+    """
+    Hindi (Devanagari) text of 16 kHz float32 audio, "" when nothing was recognized.
+    """
+    segments, info = model.transcribe(audio, **HINDI_TRANSCRIBE_SETTINGS)
+    return "".join(seg.text for seg in segments).strip()
@@ -0,0 +1,74 @@
+import hashlib
+import queue
+import threading
+from collections import OrderedDict
+
+import markdown
+
+
+MARKDOWN_EXTENSIONS = ["extra", "codehilite", "tables"]
+
+
+class MarkdownRenderer:
+    """
+    Reusable markdown -> HTML renderer.
+
+    markdown.markdown() builds a new Markdown object (extension pipeline,
+    codehilite/Pygments setup) on every call. Here a few Markdown instances
+    are built once and handed out from a queue, since one instance must not
+    convert two texts at the same time. Rendered HTML is kept in an LRU
+    keyed by the SHA-1 of the source, so repeated answers (cache hits,
+    re-opened job pages) skip conversion entirely.
+    """
+
+    def __init__(self, pool_size: int = 4, cache_entries: int = 256, extensions=None):
+        self.extensions = list(extensions or MARKDOWN_EXTENSIONS)
+        self.cache_entries = cache_entries
+
+        self._instances = queue.LifoQueue()
+        for _ in range(pool_size):
+            self._instances.put(markdown.Markdown(extensions=self.extensions))
+
+        self._cache = OrderedDict()     # sha1(text) -> html
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def convert(self, md_text: str) -> str:
+        """
+        Uncached conversion on a pooled instance.
+        """
+        md = self._instances.get()
+        try:
+            md.reset()
+            return md.convert(md_text)
+        finally:
+            self._instances.put(md)
+
+    def render(self, md_text: str) -> str:
+        key = hashlib.sha1(md_text.encode("utf-8")).hexdigest()
+
+        with self._lock:
+            html = self._cache.get(key)
+            if html is not None:
+                self._cache.move_to_end(key)
+                self.hits += 1
+                return html
+            self.misses += 1
+
+        html = self.convert(md_text)
+
+        with self._lock:
+            self._cache[key] = html
+            while len(self._cache) > self.cache_entries:
+                self._cache.popitem(last=False)
+
+        return html
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "entries": len(self._cache),
+                "hits": self.hits,
+                "misses": self.misses,
+            }
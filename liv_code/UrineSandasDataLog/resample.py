@@ -0,0 +1,140 @@
+from functools import lru_cache
+from math import gcd
+
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+
+# =========================
+# Polyphase Kernels
+# =========================
+
+HALF_ZERO_CROSSINGS = 10     # filter length per side, in zero crossings (as scipy's resample_poly)
+KAISER_BETA = 5.0
+
+
+class PolyphaseKernel:
+    """
+    Anti-aliasing FIR for src -> dst, split into its up-factor phases.
+
+    phases[p, j] = h[p + j * up], so output n is the dot product of one
+    phase row with the last `taps` input samples (no zero-stuffing).
+    `reversed` holds the rows oldest-sample-first, matching window order.
+    """
+
+    def __init__(self, src_rate: int, dst_rate: int):
+        g = gcd(src_rate, dst_rate)
+        self.up = dst_rate // g
+        self.down = src_rate // g
+
+        factor = max(self.up, self.down)
+        length = 2 * HALF_ZERO_CROSSINGS * factor + 1
+        self.center = (length - 1) // 2
+
+        n = np.arange(length) - self.center
+        h = np.sinc(n / factor) * np.kaiser(length, KAISER_BETA)
+        h *= self.up / h.sum()
+
+        self.taps = -(-length // self.up)
+        padded = np.zeros(self.taps * self.up)
+        padded[:length] = h
+        self.phases = np.ascontiguousarray(padded.reshape(self.taps, self.up).T, dtype=np.float32)
+        self.reversed = np.ascontiguousarray(self.phases[:, ::-1])
+
+
+@lru_cache(maxsize=8)
+def polyphase_kernel(src_rate: int, dst_rate: int) -> PolyphaseKernel:
+    """
+    Kernels are built once per rate pair (44.1k->16k has 160 phases x 56 taps).
+    """
+    return PolyphaseKernel(src_rate, dst_rate)
+
+
+# =========================
+# Resampler
+# =========================
+
+class Resampler:
+    """
+    Streaming polyphase resampler, float32 mono.
+
+    process() may be called with any chunk size and returns the outputs
+    that are fully determined so far; finish() pads the end and returns
+    the rest. Concatenated output equals a one-shot resample().
+    """
+
+    def __init__(self, src_rate: int, dst_rate: int):
+        self.src_rate = src_rate
+        self.dst_rate = dst_rate
+        self.kernel = polyphase_kernel(src_rate, dst_rate)
+
+        history = self.kernel.taps - 1
+        self._buf = np.zeros(history, dtype=np.float32)
+        self._base = -history       # absolute input index of self._buf[0]
+        self._next = 0              # next output index
+        self._consumed = 0          # input samples received
+
+    def _run(self, stop: int) -> np.ndarray:
+        k = self.kernel
+        if stop <= self._next:
+            return np.zeros(0, dtype=np.float32)
+
+        # Outputs n, n + up, n + 2*up, ... share a phase and step through the
+        # input by `down` samples, so each group is one strided view of the
+        # buffer's sliding windows times one filter row (no gather copy).
+        windows = sliding_window_view(self._buf, k.taps)
+        out = np.empty(stop - self._next, dtype=np.float32)
+
+        for r in range(min(k.up, out.size)):
+            q = (self._next + r) * k.down + k.center
+            first = q // k.up - (k.taps - 1) - self._base
+            count = len(range(r, out.size, k.up))
+            out[r::k.up] = windows[first:first + (count - 1) * k.down + 1:k.down] @ k.reversed[q % k.up]
+
+        self._next = stop
+        return out
+
+    def _trim(self) -> None:
+        k = self.kernel
+        oldest_needed = (self._next * k.down + k.center) // k.up - (k.taps - 1)
+        drop = oldest_needed - self._base
+        if drop > 0:
+            self._buf = self._buf[drop:]
+            self._base += drop
+
+    def process(self, samples: np.ndarray) -> np.ndarray:
+        samples = np.asarray(samples, dtype=np.float32).reshape(-1)
+        if self.src_rate == self.dst_rate:
+            return samples
+
+        k = self.kernel
+        self._buf = np.concatenate([self._buf, samples])
+        self._consumed += samples.size
+
+        end = self._base + self._buf.size           # inputs available: [.., end)
+        stop = max(self._next, (end * k.up - k.center + k.down - 1) // k.down)
+        out = self._run(stop)
+        self._trim()
+        return out
+
+    def finish(self) -> np.ndarray:
+        if self.src_rate == self.dst_rate:
+            return np.zeros(0, dtype=np.float32)
+
+        k = self.kernel
+        total = -(-self._consumed * k.up // k.down)
+        tail = k.center // k.up + k.taps + 1
+        self._buf = np.concatenate([self._buf, np.zeros(tail, dtype=np.float32)])
+        return self._run(max(self._next, total))
+
+
+def resample(samples: np.ndarray, src_rate: int, dst_rate: int) -> np.ndarray:
+    """
+    One-shot resample of a whole clip.
+    """
+    if src_rate == dst_rate:
+        return np.asarray(samples, dtype=np.float32)
+
+    resampler = Resampler(src_rate, dst_rate)
+    head = resampler.process(samples)
+    return np.concatenate([head, resampler.finish()])
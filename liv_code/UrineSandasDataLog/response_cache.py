@@ -0,0 +1,108 @@
+import hashlib
+import re
+import threading
+from concurrent.futures import Future
+from pathlib import Path
+from typing import Optional
+
+from tiered_cache import TieredCache
+
+
+_WHITESPACE = re.compile(r"\s+")
+
+
+def normalize_prompt(prompt: str) -> str:
+    """
+    Collapse runs of whitespace and trim, so the same question
+    typed or dictated with different spacing shares a cache entry.
+    """
+    return _WHITESPACE.sub(" ", prompt).strip()
+
+
+def make_key(model: str, prompt: str) -> str:
+    text = f"{model}\0{normalize_prompt(prompt)}"
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+# =========================
+# Response Cache
+# =========================
+
+class ResponseCache(TieredCache):
+    """
+    Prompt-keyed cache for LLM answers.
+
+    Two tiers (see TieredCache): memory LRU with a TTL, plus an optional
+    SQLite file so answers survive restarts.
+    """
+
+    TABLE = "ResponseCache"
+    VALUE_COLUMN = "Response"
+    EXTRA_COLUMNS = ("Model",)
+
+    def __init__(
+        self,
+        max_entries: int = 256,
+        ttl_seconds: float = 6 * 3600,
+        disk_path: Optional[Path] = None,
+    ):
+        super().__init__(max_entries, ttl_seconds, disk_path)
+
+    def get(self, model: str, prompt: str) -> Optional[str]:
+        return self.lookup(make_key(model, prompt))
+
+    def put(self, model: str, prompt: str, value: str) -> None:
+        self.store(make_key(model, prompt), value, Model=model)
+
+
+# =========================
+# Single-flight
+# =========================
+
+class SingleFlight:
+    """
+    Coalesce concurrent calls with the same key.
+
+    The first caller runs fn(), callers arriving while it is in flight
+    wait for it and get the same result (or the same exception).
+    Nothing is remembered after the call finishes, that's the cache's job.
+    """
+
+    def __init__(self):
+        self._calls = {}    # key -> Future
+        self._lock = threading.Lock()
+        self.leaders = 0
+        self.shared = 0
+
+    def do(self, key: str, fn):
+        with self._lock:
+            future = self._calls.get(key)
+            if future is not None:
+                self.shared += 1
+                leader = False
+            else:
+                future = Future()
+                self._calls[key] = future
+                self.leaders += 1
+                leader = True
+
+        if not leader:
+            return future.result()
+
+        try:
+            future.set_result(fn())
+        except BaseException as e:
+            future.set_exception(e)
+        finally:
+            with self._lock:
+                del self._calls[key]
+
+        return future.result()
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "in_flight": len(self._calls),
+                "calls": self.leaders,
+                "coalesced": self.shared,
+            }
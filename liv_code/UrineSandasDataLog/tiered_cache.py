@@ -0,0 +1,172 @@
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Optional
+
+
+# =========================
+# Two-tier cache
+# =========================
+
+class TieredCache:
+    """
+    Key -> text cache in two tiers.
+
+    Memory tier: OrderedDict with LRU eviction at max_entries, entries
+    older than ttl_seconds (when set) are not served.
+    Disk tier (optional): SQLite file that survives restarts, consulted
+    on a memory miss and promoted back into memory on a hit. It keeps
+    the newest max_disk_entries (when set), expired rows are dropped once
+    per start.
+
+    Subclasses name the table and its columns and wrap lookup()/store()
+    with their own key scheme. Thread-safe, counters via stats().
+    """
+
+    TABLE = "Cache"
+    VALUE_COLUMN = "Value"
+    EXTRA_COLUMNS = ()      # TEXT columns stored next to the value (e.g. Model)
+
+    def __init__(
+        self,
+        max_entries: int = 256,
+        ttl_seconds: Optional[float] = None,
+        disk_path: Optional[Path] = None,
+        max_disk_entries: Optional[int] = None,
+    ):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.max_disk_entries = max_disk_entries
+
+        self._entries = OrderedDict()   # key -> (created_at, value)
+        self._lock = threading.Lock()
+
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+        self._disk = None
+        self._disk_lock = threading.Lock()
+        if disk_path is not None:
+            self._open_disk(Path(disk_path))
+
+    def _fresh(self, created_at: float, now: float) -> bool:
+        return self.ttl_seconds is None or now - created_at <= self.ttl_seconds
+
+    # ---------- disk tier ----------
+    def _open_disk(self, path: Path) -> None:
+        # timeout: the file may be shared with another process
+        conn = sqlite3.connect(path, check_same_thread=False, timeout=5)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+
+        extra = "".join(f"{column} TEXT NOT NULL, " for column in self.EXTRA_COLUMNS)
+        conn.execute(f"""
+            CREATE TABLE IF NOT EXISTS {self.TABLE} (
+                Key TEXT PRIMARY KEY,
+                {extra}{self.VALUE_COLUMN} TEXT NOT NULL,
+                CreatedAt REAL NOT NULL
+            )
+        """)
+
+        if self.ttl_seconds is not None:
+            conn.execute(
+                f"DELETE FROM {self.TABLE} WHERE CreatedAt < ?",
+                (time.time() - self.ttl_seconds,),
+            )
+        if self.max_disk_entries is not None:
+            conn.execute(
+                f"DELETE FROM {self.TABLE} WHERE Key NOT IN "
+                f"(SELECT Key FROM {self.TABLE} ORDER BY CreatedAt DESC LIMIT ?)",
+                (self.max_disk_entries,),
+            )
+        conn.commit()
+        self._disk = conn
+
+    def _disk_get(self, key: str):
+        if self._disk is None:
+            return None
+        with self._disk_lock:
+            return self._disk.execute(
+                f"SELECT CreatedAt, {self.VALUE_COLUMN} FROM {self.TABLE} WHERE Key = ?",
+                (key,),
+            ).fetchone()
+
+    def _disk_put(self, key: str, created_at: float, value: str, extra: dict) -> None:
+        if self._disk is None:
+            return
+        columns = ["Key", *self.EXTRA_COLUMNS, self.VALUE_COLUMN, "CreatedAt"]
+        values = [key, *(extra[column] for column in self.EXTRA_COLUMNS), value, created_at]
+        with self._disk_lock:
+            self._disk.execute(
+                f"INSERT OR REPLACE INTO {self.TABLE} ({', '.join(columns)}) "
+                f"VALUES ({', '.join('?' * len(columns))})",
+                values,
+            )
+            self._disk.commit()
+
+    # ---------- memory tier ----------
+    def _remember(self, key: str, created_at: float, value: str) -> None:
+        # Caller holds self._lock
+        self._entries[key] = (created_at, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def lookup(self, key: str) -> Optional[str]:
+        now = time.time()
+
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                created_at, value = entry
+                if self._fresh(created_at, now):
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return value
+                del self._entries[key]
+
+        row = self._disk_get(key)
+        with self._lock:
+            if row is not None and self._fresh(row[0], now):
+                self._remember(key, row[0], row[1])
+                self.disk_hits += 1
+                return row[1]
+            self.misses += 1
+        return None
+
+    def store(self, key: str, value: str, **extra) -> None:
+        created_at = time.time()
+
+        with self._lock:
+            self._remember(key, created_at, value)
+        self._disk_put(key, created_at, value, extra)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+        if self._disk is not None:
+            with self._disk_lock:
+                self._disk.execute(f"DELETE FROM {self.TABLE}")
+                self._disk.commit()
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.disk_hits + self.misses
+            stats = {
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "hits": self.hits,
+                "disk_hits": self.disk_hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_rate": round((self.hits + self.disk_hits) / lookups, 3) if lookups else 0.0,
+                "disk_tier": self._disk is not None,
+            }
+        if self.ttl_seconds is not None:
+            stats["ttl_seconds"] = self.ttl_seconds
+        return stats
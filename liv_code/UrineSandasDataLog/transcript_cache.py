@@ -0,0 +1,48 @@
+import hashlib
+import json
+from pathlib import Path
+from typing import Optional
+
+import numpy as np
+
+from tiered_cache import TieredCache
+
+
+def transcript_key(audio: np.ndarray, model: str, **settings) -> str:
+    """
+    Content hash of the 16 kHz float32 samples plus everything that changes
+    the output (model, language, task, beam size, initial prompt...).
+    """
+    samples = np.ascontiguousarray(audio, dtype="<f4")
+    digest = hashlib.blake2b(digest_size=20)
+    digest.update(json.dumps({"model": model, **settings}, sort_keys=True).encode("utf-8"))
+    digest.update(b"\0")
+    digest.update(memoryview(samples).cast("B"))
+    return digest.hexdigest()
+
+
+# =========================
+# Transcript Cache
+# =========================
+
+class TranscriptCache(TieredCache):
+    """
+    Audio-keyed cache for Whisper transcripts (keys from transcript_key()).
+
+    Two tiers (see TieredCache). Decoding is deterministic for fixed
+    settings, so entries don't expire; the disk tier keeps the newest
+    max_disk_entries.
+    """
+
+    TABLE = "TranscriptCache"
+    VALUE_COLUMN = "Text"
+
+    def __init__(self, max_entries: int = 512, disk_path: Optional[Path] = None,
+                 max_disk_entries: int = 20000):
+        super().__init__(max_entries, None, disk_path, max_disk_entries)
+
+    def get(self, key: str) -> Optional[str]:
+        return self.lookup(key)
+
+    def put(self, key: str, text: str) -> None:
+        self.store(key, text)
@@ -0,0 +1,117 @@
+from typing import Optional
+
+import numpy as np
+
+
+# =========================
+# Energy VAD Segmenter
+# =========================
+
+class UtteranceSegmenter:
+    """
+    Incremental voice-activity segmentation of a mono float32 stream.
+
+    Audio is fed in arbitrary sized pieces. It is cut into 30 ms frames,
+    each frame is voiced when its RMS is well above a running noise floor.
+    An utterance opens after min_speech_ms of voice (keeping pre_roll_ms
+    of audio before it) and closes after silence_ms of quiet, or when it
+    reaches max_utterance_s. feed() returns the utterances that closed.
+    """
+
+    def __init__(
+        self,
+        sample_rate: int = 16000,
+        frame_ms: int = 30,
+        silence_ms: int = 600,
+        min_speech_ms: int = 120,
+        pre_roll_ms: int = 210,
+        max_utterance_s: float = 15.0,
+        threshold_ratio: float = 3.0,
+        min_rms: float = 0.004,
+    ):
+        self.sample_rate = sample_rate
+        self.frame_len = sample_rate * frame_ms // 1000
+        self.silence_frames = max(1, silence_ms // frame_ms)
+        self.min_speech_frames = max(1, min_speech_ms // frame_ms)
+        self.pre_roll_frames = pre_roll_ms // frame_ms
+        self.max_frames = int(max_utterance_s * 1000 / frame_ms)
+        self.threshold_ratio = threshold_ratio
+        self.min_rms = min_rms
+
+        self.noise_floor: Optional[float] = None
+        self._pending = np.zeros(0, dtype=np.float32)   # < one frame left over
+        self._recent = []          # last frames while not in speech (pre-roll)
+        self._utterance = []       # frames of the open utterance
+        self._voiced_run = 0
+        self._silent_run = 0
+        self.in_speech = False
+
+    def _is_voiced(self, frame: np.ndarray) -> bool:
+        rms = float(np.sqrt(np.mean(frame * frame)))
+
+        if self.noise_floor is None:
+            self.noise_floor = rms
+        threshold = max(self.min_rms, self.noise_floor * self.threshold_ratio)
+        voiced = rms > threshold
+
+        # Track the floor on quiet frames only, slowly
+        if not voiced:
+            self.noise_floor = 0.95 * self.noise_floor + 0.05 * rms
+        return voiced
+
+    def _close(self) -> np.ndarray:
+        audio = np.concatenate(self._utterance)
+        self._utterance = []
+        self._recent = []
+        self._voiced_run = 0
+        self._silent_run = 0
+        self.in_speech = False
+        return audio
+
+    def feed(self, samples: np.ndarray) -> list:
+        samples = np.asarray(samples, dtype=np.float32).reshape(-1)
+        if self._pending.size:
+            samples = np.concatenate([self._pending, samples])
+
+        n_frames = samples.size // self.frame_len
+        self._pending = samples[n_frames * self.frame_len:].copy()
+
+        closed = []
+        for i in range(n_frames):
+            frame = samples[i * self.frame_len:(i + 1) * self.frame_len]
+            voiced = self._is_voiced(frame)
+
+            if not self.in_speech:
+                self._recent.append(frame)
+                self._voiced_run = self._voiced_run + 1 if voiced else 0
+
+                if self._voiced_run >= self.min_speech_frames:
+                    self.in_speech = True
+                    self._utterance = self._recent[-(self.pre_roll_frames + self._voiced_run):]
+                    self._recent = []
+                    self._silent_run = 0
+                else:
+                    del self._recent[:-(self.pre_roll_frames + self.min_speech_frames)]
+                continue
+
+            self._utterance.append(frame)
+            self._silent_run = 0 if voiced else self._silent_run + 1
+
+            if self._silent_run >= self.silence_frames or len(self._utterance) >= self.max_frames:
+                closed.append(self._close())
+
+        return closed
+
+    def flush(self) -> Optional[np.ndarray]:
+        """
+        End of stream: return the open utterance, if any.
+        """
+        if self.in_speech and self._utterance:
+            if self._pending.size:
+                self._utterance.append(self._pending)
+            self._pending = np.zeros(0, dtype=np.float32)
+            return self._close()
+
+        self._pending = np.zeros(0, dtype=np.float32)
+        self._recent = []
+        return None
@@ -0,0 +1,124 @@
+// Shared by game_help.html, gemini_help.html and transcribe.html,
+// pulled into their <script> by a Jinja include (so no static route is needed).
+
+// Streams the answer into the page when answerEl is given. Otherwise,
+// or if streaming is unavailable, submits a background Gemini job and
+// polls until the answer is ready, so a slow answer doesn't hold a
+// server request open. Falls back to the normal form POST if anything
+// goes wrong.
+
+// Stream the answer over Server-Sent Events into answerEl.
+// Text chunks are shown as plain text while they arrive, the "done"
+// event replaces them with the rendered answer.
+// Resolves true once the stream finished, false if streaming isn't
+// available so the caller can fall back to the job / form route.
+// A stream that breaks half way falls back to the normal form POST.
+async function streamAnswer(form, kind, statusEl, answerEl) {
+    let resp;
+    try {
+        resp = await fetch("/gemini-stream/" + kind, {
+            method: "POST",
+            body: new FormData(form)
+        });
+    } catch (err) {
+        return false;
+    }
+    if (!resp.ok || !resp.body) {
+        return false;
+    }
+
+    statusEl.textContent = "Gemini is answering…";
+    answerEl.style.display = "block";
+    answerEl.style.whiteSpace = "pre-wrap";
+    answerEl.textContent = "";
+
+    try {
+        const reader = resp.body.getReader();
+        const decoder = new TextDecoder();
+        let buffer = "";
+
+        while (true) {
+            const { value, done } = await reader.read();
+            if (done) {
+                throw new Error("Stream ended before the answer was complete");
+            }
+            buffer += decoder.decode(value, { stream: true });
+
+            // SSE events are separated by a blank line
+            let sep;
+            while ((sep = buffer.indexOf("\n\n")) !== -1) {
+                const raw = buffer.slice(0, sep);
+                buffer = buffer.slice(sep + 2);
+
+                let eventName = "message";
+                let data = "";
+                for (const line of raw.split("\n")) {
+                    if (line.startsWith("event: ")) {
+                        eventName = line.slice(7);
+                    } else if (line.startsWith("data: ")) {
+                        data += line.slice(6);
+                    }
+                }
+                const payload = JSON.parse(data);
+
+                if (eventName === "error") {
+                    statusEl.textContent = payload.error;
+                    return true;
+                }
+                if (eventName === "done") {
+                    answerEl.style.whiteSpace = "";
+                    answerEl.innerHTML = payload.html;
+                    statusEl.textContent = "";
+                    return true;
+                }
+                answerEl.textContent += payload.text;
+            }
+        }
+    } catch (err) {
+        statusEl.textContent = "Streaming failed, loading the answer page…";
+        form.dataset.fallback = "1";
+        form.submit();
+        return true;
+    }
+}
+
+function submitAsJob(form, kind, statusEl, answerEl) {
+    form.addEventListener("submit", async (event) => {
+        if (form.dataset.fallback === "1") {
+            return;
+        }
+        event.preventDefault();
+        statusEl.textContent = "Submitting…";
+
+        if (answerEl && await streamAnswer(form, kind, statusEl, answerEl)) {
+            return;
+        }
+
+        try {
+            const resp = await fetch("/gemini-jobs/" + kind, {
+                method: "POST",
+                body: new FormData(form)
+            });
+            if (resp.status !== 202) {
+                throw new Error("HTTP " + resp.status);
+            }
+            const job = await resp.json();
+
+            while (true) {
+                await new Promise((r) => setTimeout(r, 1000));
+                const poll = await fetch(job.status_url);
+                const state = await poll.json();
+
+                if (state.status === "pending") {
+                    statusEl.textContent = "Waiting for Gemini… " + state.elapsed + "s";
+                    continue;
+                }
+                window.location.href = job.view_url;
+                return;
+            }
+        } catch (err) {
+            form.dataset.fallback = "1";
+            form.submit();
+        }
+    });
+}
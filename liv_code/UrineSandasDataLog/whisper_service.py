@@ -0,0 +1,359 @@
+import os
+import queue
+import threading
+import time
+import uuid
+from concurrent.futures import Future
+from typing import Optional
+
+import numpy as np
+
+
+# =========================
+# Background Model Loader
+# =========================
+
+class WhisperLoader:
+    """
+    Loads a faster-whisper model on a background thread.
+
+    The faster_whisper import itself (CTranslate2) is slow, so it also
+    happens on the thread. After loading, one warm-up inference on a
+    second of silence pays the first-call setup cost before any real
+    request arrives. Timings are kept for /ready and the startup log.
+    """
+
+    def __init__(self, model_size: str, device: str, compute_type: str,
+                 sample_rate: int = 16000, **model_kwargs):
+        self.model_size = model_size
+        self.device = device
+        self.compute_type = compute_type
+        self.sample_rate = sample_rate
+        self.model_kwargs = model_kwargs
+
+        self.model = None
+        self.error: Optional[BaseException] = None
+        self.created_at = time.perf_counter()
+        self.load_seconds: Optional[float] = None
+        self.warmup_seconds: Optional[float] = None
+        self.cold_start_seconds: Optional[float] = None
+
+        self._ready = threading.Event()
+        self._thread = None
+
+    def start(self) -> "WhisperLoader":
+        self._thread = threading.Thread(target=self._load, name="whisper-loader", daemon=True)
+        self._thread.start()
+        return self
+
+    def _load(self) -> None:
+        try:
+            print(f"Loading Whisper model ({self.model_size}) on {self.device} "
+                  f"with compute_type={self.compute_type}...")
+            start = time.perf_counter()
+
+            from faster_whisper import WhisperModel
+            model = WhisperModel(
+                self.model_size,
+                device=self.device,
+                compute_type=self.compute_type,
+                **self.model_kwargs,
+            )
+            loaded = time.perf_counter()
+
+            silence = np.zeros(self.sample_rate, dtype=np.float32)
+            segments, _ = model.transcribe(silence, language="hi", beam_size=1)
+            list(segments)  # transcribe() is lazy, consume it to actually decode
+            warmed = time.perf_counter()
+
+            self.model = model
+            self.load_seconds = round(loaded - start, 2)
+            self.warmup_seconds = round(warmed - loaded, 2)
+            self.cold_start_seconds = round(warmed - self.created_at, 2)
+            print(f"Model loaded in {self.load_seconds}s, warm-up {self.warmup_seconds}s, "
+                  f"ready {self.cold_start_seconds}s after start.")
+
+        except BaseException as e:
+            self.error = e
+            print(f"Error loading Whisper model: {e}")
+
+        finally:
+            self._ready.set()
+
+    @property
+    def ready(self) -> bool:
+        return self._ready.is_set() and self.model is not None
+
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        self._ready.wait(timeout)
+        return self.ready
+
+    def status(self) -> dict:
+        if self.ready:
+            state = "ready"
+        elif self.error is not None:
+            state = "failed"
+        else:
+            state = "loading"
+
+        result = {
+            "status": state,
+            "model": self.model_size,
+            "device": self.device,
+            "compute_type": self.compute_type,
+            "load_seconds": self.load_seconds,
+            "warmup_seconds": self.warmup_seconds,
+            "cold_start_seconds": self.cold_start_seconds,
+        }
+        if state == "loading":
+            result["elapsed_seconds"] = round(time.perf_counter() - self.created_at, 2)
+        if self.error is not None:
+            result["error"] = str(self.error)
+        return result
+
+
+# =========================
+# Inference Worker Pool
+# =========================
+
+def default_worker_split(workers: Optional[int] = None) -> tuple:
+    """
+    (workers, cpu_threads per worker) for this machine.
+    Defaults to one worker per 4 cores, at least 1.
+    """
+    cores = os.cpu_count() or 1
+    if workers is None:
+        workers = max(1, cores // 4)
+    workers = max(1, min(workers, cores))
+    return workers, max(1, cores // workers)
+
+
+class PoolBusy(RuntimeError):
+    def __init__(self, retry_after: int):
+        super().__init__(f"Transcription queue is full, retry in {retry_after}s")
+        self.retry_after = retry_after
+
+
+class WhisperPool:
+    """
+    N inference threads in front of one faster-whisper model.
+
+    The model is created with num_workers=N, so N transcribe() calls
+    really run in parallel (each with its own cpu_threads share) while
+    the weights are loaded once. Requests wait in a bounded queue;
+    when it's full submit() raises PoolBusy with a Retry-After estimate
+    instead of letting requests pile up.
+    """
+
+    def __init__(self, loader: WhisperLoader, workers: int, max_queue: int = 8):
+        self.loader = loader
+        self.workers = workers
+        self.max_queue = max_queue
+
+        self._queue = queue.Queue(maxsize=max_queue)
+        self._lock = threading.Lock()
+        self.completed = 0
+        self.rejected = 0
+        self.busy = 0
+        self._queue_seconds = 0.0
+        self._infer_seconds = 0.0
+
+        for i in range(workers):
+            threading.Thread(target=self._worker, name=f"whisper-{i}", daemon=True).start()
+
+    def _worker(self) -> None:
+        self.loader.wait()
+        while True:
+            fn, future, queued_at = self._queue.get()
+            if not future.set_running_or_notify_cancel():
+                continue
+
+            started = time.perf_counter()
+            with self._lock:
+                self.busy += 1
+            try:
+                result = fn(self.loader.model)
+                ok = True
+            except BaseException as e:
+                future.set_exception(e)
+                ok = False
+            finished = time.perf_counter()
+
+            with self._lock:
+                self.busy -= 1
+                self.completed += 1
+                self._queue_seconds += started - queued_at
+                self._infer_seconds += finished - started
+
+            if ok:
+                future.set_result({
+                    "result": result,
+                    "queue_ms": round((started - queued_at) * 1000, 1),
+                    "inference_ms": round((finished - started) * 1000, 1),
+                })
+
+    def _retry_after(self) -> int:
+        # Caller holds self._lock
+        avg = self._infer_seconds / self.completed if self.completed else 5.0
+        waiting = self._queue.qsize() + self.busy
+        return max(1, int(avg * waiting / self.workers + 0.5))
+
+    def submit(self, fn) -> Future:
+        """
+        Queue fn(model). The Future resolves to
+        {"result": ..., "queue_ms": ..., "inference_ms": ...}.
+        """
+        future = Future()
+        try:
+            self._queue.put_nowait((fn, future, time.perf_counter()))
+        except queue.Full:
+            with self._lock:
+                self.rejected += 1
+                raise PoolBusy(self._retry_after()) from None
+        return future
+
+    def stats(self) -> dict:
+        with self._lock:
+            done = self.completed
+            return {
+                "workers": self.workers,
+                "busy": self.busy,
+                "queued": self._queue.qsize(),
+                "max_queue": self.max_queue,
+                "completed": done,
+                "rejected": self.rejected,
+                "avg_queue_ms": round(self._queue_seconds * 1000 / done, 1) if done else None,
+                "avg_inference_ms": round(self._infer_seconds * 1000 / done, 1) if done else None,
+            }
+
+
+# =========================
+# Streaming Sessions
+# =========================
+
+class TranscriptionStream:
+    """
+    One live dictation: audio frames in, utterance texts out, in order.
+
+    Frames go through a VAD segmenter; every closed utterance is queued
+    on the WhisperPool right away, so decoding overlaps with speaking.
+    Utterances the pool can't take yet (PoolBusy) wait here and are
+    retried on the next feed()/poll.
+    """
+
+    def __init__(self, pool: WhisperPool, segmenter, transcribe_fn, resampler=None):
+        self.id = uuid.uuid4().hex
+        self.pool = pool
+        self.segmenter = segmenter
+        self.transcribe_fn = transcribe_fn
+        self.resampler = resampler    # client rate -> segmenter rate, if they differ
+        self.last_seen = time.time()
+        self.finished = False
+
+        self._waiting = []      # utterances not yet accepted by the pool
+        self._futures = []      # in utterance order
+        self._delivered = 0
+        self._lock = threading.Lock()
+
+    def _pump(self) -> None:
+        # Caller holds self._lock
+        while self._waiting:
+            audio = self._waiting[0]
+            try:
+                future = self.pool.submit(lambda model, a=audio: self.transcribe_fn(model, a))
+            except PoolBusy:
+                return
+            self._futures.append(future)
+            self._waiting.pop(0)
+
+    def feed(self, samples) -> None:
+        with self._lock:
+            self.last_seen = time.time()
+            if self.resampler is not None:
+                samples = self.resampler.process(samples)
+            self._waiting.extend(self.segmenter.feed(samples))
+            self._pump()
+
+    def finish(self) -> None:
+        with self._lock:
+            self.last_seen = time.time()
+            if not self.finished:
+                if self.resampler is not None:
+                    self._waiting.extend(self.segmenter.feed(self.resampler.finish()))
+                tail = self.segmenter.flush()
+                if tail is not None:
+                    self._waiting.append(tail)
+                self.finished = True
+            self._pump()
+
+    def poll(self) -> dict:
+        """
+        Texts of utterances finished since the last poll (in order) and
+        whether everything is done.
+        """
+        with self._lock:
+            self.last_seen = time.time()
+            self._pump()
+
+            texts = []
+            while self._delivered < len(self._futures) and self._futures[self._delivered].done():
+                future = self._futures[self._delivered]
+                self._delivered += 1
+                if future.exception() is not None:
+                    texts.append(f"[Error: {future.exception()}]")
+                else:
+                    texts.append(future.result()["result"])
+
+            pending = len(self._waiting) + len(self._futures) - self._delivered
+            return {
+                "texts": texts,
+                "pending_utterances": pending,
+                "in_speech": self.segmenter.in_speech,
+                "done": self.finished and pending == 0,
+            }
+
+    def wait(self, timeout: float) -> dict:
+        """
+        After finish(): block until all utterances are decoded (or timeout),
+        returning everything not delivered yet.
+        """
+        deadline = time.time() + timeout
+        texts = []
+        while True:
+            state = self.poll()
+            texts.extend(state["texts"])
+            if state["done"] or time.time() >= deadline:
+                state["texts"] = texts
+                return state
+            time.sleep(0.05)
+
+
+class StreamRegistry:
+    """
+    Live TranscriptionStreams by id, idle ones expire after idle_seconds.
+    """
+
+    def __init__(self, idle_seconds: float = 300, max_streams: int = 16):
+        self.idle_seconds = idle_seconds
+        self.max_streams = max_streams
+        self._streams = {}
+        self._lock = threading.Lock()
+
+    def add(self, stream: TranscriptionStream) -> bool:
+        with self._lock:
+            cutoff = time.time() - self.idle_seconds
+            for sid in [s.id for s in self._streams.values() if s.last_seen < cutoff]:
+                del self._streams[sid]
+
+            if len(self._streams) >= self.max_streams:
+                return False
+            self._streams[stream.id] = stream
+            return True
+
+    def get(self, stream_id: str) -> Optional[TranscriptionStream]:
+        with self._lock:
+            return self._streams.get(stream_id)
+
+    def remove(self, stream_id: str) -> None:
+        with self._lock:
+            self._streams.pop(stream_id, None)